@@ -3,10 +3,10 @@
 Assign existing GitHub issues to copilot-swe-agent using GraphQL
 """
 
+import argparse
 import subprocess
 import sys
-import time
-import requests
+from github_client import GitHubClient, chunked
 
 # Configuration
 def get_github_token():
@@ -26,173 +26,184 @@ GITHUB_TOKEN = get_github_token()
 REPO_OWNER = 'pixelsock'
 REPO_NAME = 'fuma'
 COPILOT_BOT_ID = 'BOT_kgDOC9w8XQ'
+POOL_SIZE = 10
+BATCH_SIZE = 50
+DEFAULT_RANGE = '4-48'
+INSTRUCTION_COMMENT = 'The area requiring changes is highlighted with a light purple circle indicator in the screenshot.'
+ISSUE_FIELDS = '{ id number title assignees(first: 10) { nodes { login } } }'
 
-def graphql_query(query, variables=None):
-    """Execute GraphQL query"""
-    headers = {
-        'Authorization': f'bearer {GITHUB_TOKEN}',
-        'Content-Type': 'application/json'
-    }
-
-    payload = {'query': query}
-    if variables:
-        payload['variables'] = variables
-
-    response = requests.post(
-        'https://api.github.com/graphql',
-        json=payload,
-        headers=headers
-    )
-    response.raise_for_status()
-    return response.json()
+CLIENT = GitHubClient(GITHUB_TOKEN, pool_size=POOL_SIZE)
 
-def get_issue_id(issue_number):
-    """Get GraphQL ID for an issue"""
+def graphql_query(query, variables=None):
+    """Execute GraphQL query over the shared pooled session"""
+    return CLIENT.graphql(query, variables)
+
+def fetch_issues_by_number(issue_numbers, batch_size=BATCH_SIZE):
+    """Resolve issue IDs and assignees in aliased batches (i4: issue(number: 4) { ... })"""
+    issues = {}
+
+    for batch in chunked(sorted(set(issue_numbers)), batch_size):
+        fields = '\n'.join(f'            i{n}: issue(number: {n}) {ISSUE_FIELDS}' for n in batch)
+        query = f'''
+        query($owner: String!, $name: String!) {{
+          repository(owner: $owner, name: $name) {{
+{fields}
+          }}
+        }}
+        '''
+
+        result = graphql_query(query, {'owner': REPO_OWNER, 'name': REPO_NAME})
+        repository = (result.get('data') or {}).get('repository') or {}
+
+        for n in batch:
+            issue = repository.get(f'i{n}')
+            if issue:
+                issues[n] = issue
+            else:
+                print(f'  ✗ Issue #{n} not found')
+
+    return issues
+
+def fetch_issues_by_filter(label=None, assignee=None):
+    """Resolve issue IDs and assignees from one paginated issues connection"""
     query = '''
-    query($owner: String!, $name: String!, $number: Int!) {
+    query($owner: String!, $name: String!, $cursor: String, $filterBy: IssueFilters) {
       repository(owner: $owner, name: $name) {
-        issue(number: $number) {
-          id
-          title
-          assignees(first: 10) {
-            nodes {
-              login
-            }
+        issues(first: 100, after: $cursor, states: OPEN, filterBy: $filterBy) {
+          pageInfo {
+            hasNextPage
+            endCursor
           }
+          nodes %s
         }
       }
     }
-    '''
+    ''' % ISSUE_FIELDS
+
+    filter_by = {}
+    if label:
+        filter_by['labels'] = [label]
+    if assignee:
+        filter_by['assignee'] = assignee
+
+    issues = {}
+    cursor = None
+
+    while True:
+        variables = {
+            'owner': REPO_OWNER,
+            'name': REPO_NAME,
+            'cursor': cursor,
+            'filterBy': filter_by
+        }
 
-    variables = {
-        'owner': REPO_OWNER,
-        'name': REPO_NAME,
-        'number': issue_number
-    }
+        result = graphql_query(query, variables)
+        connection = result['data']['repository']['issues']
 
-    result = graphql_query(query, variables)
-    return result['data']['repository']['issue']
-
-def assign_copilot_to_issue(issue_id):
-    """Assign copilot-swe-agent to an issue"""
-    mutation = '''
-    mutation($issueId: ID!, $actorIds: [ID!]!) {
-      replaceActorsForAssignable(input: {
-        assignableId: $issueId,
-        actorIds: $actorIds
-      }) {
-        assignable {
-          ... on Issue {
-            id
-            title
-            assignees(first: 10) {
-              nodes {
-                login
-              }
-            }
-          }
-        }
-      }
-    }
-    '''
+        for issue in connection['nodes']:
+            issues[issue['number']] = issue
 
-    variables = {
-        'issueId': issue_id,
-        'actorIds': [COPILOT_BOT_ID]
-    }
+        if not connection['pageInfo']['hasNextPage']:
+            break
 
-    result = graphql_query(mutation, variables)
-    return result
-
-def add_comment_to_issue(issue_id, comment_body):
-    """Add comment to issue using GraphQL"""
-    mutation = '''
-    mutation($issueId: ID!, $body: String!) {
-      addComment(input: {
-        subjectId: $issueId,
-        body: $body
-      }) {
-        commentEdge {
-          node {
-            id
-          }
-        }
-      }
-    }
-    '''
+        cursor = connection['pageInfo']['endCursor']
 
-    variables = {
-        'issueId': issue_id,
-        'body': comment_body
-    }
+    return issues
+
+def assign_copilot_to_issues(issue_ids):
+    """Assign copilot-swe-agent to several issues with aliased replaceActorsForAssignable mutations"""
+    inputs = [{'assignableId': issue_id, 'actorIds': [COPILOT_BOT_ID]} for issue_id in issue_ids]
+    selection = '{ assignable { ... on Issue { id number } } }'
+    return CLIENT.aliased_mutation('replaceActorsForAssignable', 'ReplaceActorsForAssignableInput', inputs, selection, alias_prefix='a')
 
-    result = graphql_query(mutation, variables)
-    return 'errors' not in result
+def add_comments_to_issues(issue_ids, comment_body):
+    """Add the same comment to several issues with aliased addComment mutations"""
+    inputs = [{'subjectId': issue_id, 'body': comment_body} for issue_id in issue_ids]
+    return CLIENT.aliased_mutation('addComment', 'AddCommentInput', inputs, '{ commentEdge { node { id } } }', alias_prefix='c')
+
+def parse_range(value):
+    """Parse '4-48' into [4, ..., 48]"""
+    start, end = value.split('-')
+    return list(range(int(start), int(end) + 1))
 
 def main():
+    ap = argparse.ArgumentParser(description='Assign existing GitHub issues to copilot-swe-agent.')
+    ap.add_argument('--range', default=DEFAULT_RANGE, help='Inclusive issue number range (default: %(default)s)')
+    ap.add_argument('--issues', type=int, nargs='+', help='Explicit issue numbers (overrides --range)')
+    ap.add_argument('--label', help='Select open issues with this label instead of by number')
+    ap.add_argument('--assignee', help='Select open issues with this assignee instead of by number')
+    ap.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Issues per aliased request (default: %(default)s)')
+    args = ap.parse_args()
+
     if not GITHUB_TOKEN:
         print('Error: GitHub authentication not found')
         sys.exit(1)
 
     print(f'✓ GitHub authenticated (using gh CLI)\n')
 
-    # Get issue numbers to update (issues 4-48)
-    issue_numbers = list(range(4, 49))  # 4 to 48 inclusive
-
-    print(f'Assigning copilot-swe-agent to {len(issue_numbers)} issues...\n')
+    # Resolve the issues to update
+    if args.label or args.assignee:
+        print('Fetching issues by filter...')
+        issues = fetch_issues_by_filter(label=args.label, assignee=args.assignee)
+    else:
+        issue_numbers = args.issues or parse_range(args.range)
+        print(f'Fetching {len(issue_numbers)} issues...')
+        issues = fetch_issues_by_number(issue_numbers, args.batch_size)
+
+    to_assign = []
+    already_assigned = 0
+    for number, issue in sorted(issues.items()):
+        current_assignees = [a['login'] for a in issue['assignees']['nodes']]
+        if 'copilot-swe-agent' in current_assignees:
+            already_assigned += 1
+        else:
+            to_assign.append(issue)
+
+    print(f'  {already_assigned} already assigned, {len(to_assign)} need copilot-swe-agent\n')
 
     updated_count = 0
     failed_count = 0
 
-    for issue_num in issue_numbers:
-        try:
-            print(f'[{issue_num - 3}/{len(issue_numbers)}] Processing issue #{issue_num}...')
-
-            # Get issue details
-            issue_data = get_issue_id(issue_num)
-            issue_id = issue_data['id']
-            title = issue_data['title']
-            current_assignees = [a['login'] for a in issue_data['assignees']['nodes']]
-
-            # Check if already assigned
-            if 'copilot-swe-agent' in current_assignees:
-                print(f'  ✓ Already assigned to copilot-swe-agent')
-                updated_count += 1
-                continue
+    for batch in chunked(to_assign, args.batch_size):
+        print(f'Assigning batch of {len(batch)} issues...')
 
-            # Assign to copilot
-            result = assign_copilot_to_issue(issue_id)
+        try:
+            results = assign_copilot_to_issues([issue['id'] for issue in batch])
+        except Exception as e:
+            print(f'  ✗ Error: {e}\n')
+            failed_count += len(batch)
+            continue
 
-            if 'errors' in result:
-                print(f'  ✗ Error: {result["errors"]}')
+        assigned_ids = []
+        for issue, result in zip(batch, results):
+            if result['data'] is None:
+                print(f'  ✗ Issue #{issue["number"]}: {result["errors"]}')
                 failed_count += 1
-                continue
-
-            print(f'  ✓ Assigned to copilot-swe-agent')
+            else:
+                print(f'  ✓ Issue #{issue["number"]} assigned to copilot-swe-agent')
+                assigned_ids.append(issue['id'])
 
-            # Add instruction comment if not already present
-            # (We'll assume it needs to be added for all)
-            instruction = 'The area requiring changes is highlighted with a light purple circle indicator in the screenshot.'
-            if add_comment_to_issue(issue_id, instruction):
-                print(f'  ✓ Added instruction comment')
+        updated_count += len(assigned_ids)
 
-            updated_count += 1
-            print('')
+        # Add instruction comment to the newly assigned issues
+        if assigned_ids:
+            try:
+                comment_results = add_comments_to_issues(assigned_ids, INSTRUCTION_COMMENT)
+                added = [r for r in comment_results if r['data'] is not None]
+                print(f'  ✓ Added instruction comment to {len(added)}/{len(assigned_ids)} issues')
+            except Exception as e:
+                print(f'  ✗ Error adding comments: {e}')
 
-            # Rate limiting
-            time.sleep(2)
-
-        except Exception as e:
-            print(f'  ✗ Error: {e}')
-            failed_count += 1
-            print('')
-            continue
+        print('')
 
     print(f'═══════════════════════════════════════')
     print(f'✓ Complete!')
     print(f'  Updated: {updated_count} issues')
+    print(f'  Already assigned: {already_assigned} issues')
     print(f'  Failed: {failed_count} issues')
     print(f'  Repository: https://github.com/{REPO_OWNER}/{REPO_NAME}/issues')
+    CLIENT.print_timing_summary()
+    CLIENT.close()
 
 if __name__ == '__main__':
     main()
@@ -1,88 +1,201 @@
 #!/usr/bin/env python3
 """
 Auto Merge Monitor - Automatically merges PRs as they become ready
+
+Instead of a flat check interval, each PR has its own poll schedule: UNKNOWN
+mergeability and pending CI are re-checked quickly, and PRs whose state does
+not change are backed off exponentially. The monitor wakes when the earliest
+PR is due and refreshes all PRs with one list request.
+
+Mergeable PRs are merged in the order chosen by merge_planner, which keeps
+PRs that touch the same files apart, and the monitor reports how many
+conflicts it predicted against how many merges actually hit one.
+
+Independent PRs are merged concurrently by merge_executor, retrying only PRs
+that lose a "base branch was modified" race; with --auto-merge, GitHub's
+auto-merge serializes the merges instead.
+
+PR state is cached in memory: each iteration costs one list request plus the
+merges, the cache is updated from merge responses, and the summary is served
+from it.
 """
 
+import os
+import argparse
 import subprocess
-import json
+import threading
 import time
 from datetime import datetime
-from typing import List, Dict
+from typing import Dict, List, Optional, Set, Tuple
 import sys
+from pr_client import PRClient, PullRequest, CallResult
+from merge_planner import plan_merges
+from merge_executor import MergeExecutor, MAX_WORKERS
+from poll_schedule import PollSchedule, FAST_INTERVAL, UNKNOWN_INTERVAL, POLLING_MAX_INTERVAL
 
 REPO = "pixelsock/fuma"
-CHECK_INTERVAL = 60  # Check every 60 seconds
-MAX_ITERATIONS = 120  # Run for max 2 hours (120 * 60 seconds)
+MAX_RUNTIME = 2 * 60 * 60  # Run for max 2 hours
 
 class AutoMergeMonitor:
-    def __init__(self):
+    def __init__(self, max_workers: int = MAX_WORKERS, auto_merge: bool = False):
+        self.auto_merge = auto_merge
+        self.log_lock = threading.Lock()  # Merge workers log concurrently
+        self.auto_merge_prs: Set[int] = set()  # Handed to GitHub auto-merge
         self.merged_prs: List[int] = []
         self.conflicting_prs: List[int] = []
         self.iterations = 0
+        self.schedule = PollSchedule(max_interval=POLLING_MAX_INTERVAL)  # Polling is the only signal
+        self.open_prs: Dict[int, PullRequest] = {}  # PR number -> last known state
+        self.list_requests = 0
+        self.predicted_conflicts: Set[int] = set()
+        self.actual_conflicts: Set[int] = set()
+        self.prs = PRClient(REPO, self.get_github_token())
+        self.executor = MergeExecutor(self.merge_pr, max_workers=max_workers, log=self.log)
+        self.started = time.monotonic()
 
     def log(self, message: str, level: str = "INFO"):
         """Log message with timestamp"""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"[{timestamp}] [{level}] {message}")
-        sys.stdout.flush()
+        with self.log_lock:
+            print(f"[{timestamp}] [{level}] {message}")
+            sys.stdout.flush()
 
-    def run_gh_command(self, cmd: List[str]) -> str:
-        """Run gh CLI command and return output"""
+    def get_github_token(self) -> Optional[str]:
+        """Get GitHub token from environment variable or, once at startup, the gh CLI"""
+        token = os.environ.get('GITHUB_TOKEN')
+        if token:
+            return token
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=True
-            )
+            result = subprocess.run(['gh', 'auth', 'token'], capture_output=True, text=True, check=True)
             return result.stdout.strip()
-        except subprocess.CalledProcessError as e:
-            self.log(f"Command failed: {' '.join(cmd)}", "ERROR")
-            self.log(f"Error: {e.stderr}", "ERROR")
-            return ""
-
-    def get_open_prs(self) -> List[Dict]:
-        """Get all open PRs with their mergeable status"""
-        output = self.run_gh_command([
-            'gh', 'pr', 'list',
-            '--repo', REPO,
-            '--state', 'open',
-            '--json', 'number,title,mergeable',
-            '--limit', '100'
-        ])
-
-        if not output:
-            return []
-
-        return json.loads(output)
-
-    def merge_pr(self, pr_number: int, pr_title: str) -> bool:
+        except (OSError, subprocess.CalledProcessError) as e:
+            self.log(f"Could not read token from gh CLI: {e}", "ERROR")
+            return None
+
+    def get_open_prs(self) -> List[PullRequest]:
+        """
+        Refresh the cached PR state with one list request and return it
+        If the request fails the previous state is kept
+        """
+        self.list_requests += 1
+        result = self.prs.list_prs(state="OPEN")
+        if not result.ok:
+            self.log(f"Failed to list PRs, keeping last known state: {result.error}", "ERROR")
+        else:
+            self.open_prs = {pr.number: pr for pr in result.value}
+
+        return list(self.open_prs.values())
+
+    def record_merge(self, pr: PullRequest, result: CallResult):
+        """Update the cached PR state from a merge response"""
+        if result.ok:
+            self.open_prs.pop(pr.number, None)
+            # The base branch moved, so GitHub recomputes every other PR's mergeability
+            for other in self.open_prs.values():
+                other.mergeable = 'UNKNOWN'
+        elif self.is_conflict(result) and pr.number in self.open_prs:
+            self.open_prs[pr.number].mergeable = 'CONFLICTING'
+
+    def merge_pr(self, pr: PullRequest) -> CallResult:
         """Attempt to merge a PR"""
-        self.log(f"Merging PR #{pr_number}: {pr_title}")
-
-        result = self.run_gh_command([
-            'gh', 'pr', 'merge', str(pr_number),
-            '--repo', REPO,
-            '--squash',
-            '--delete-branch'
-        ])
-
-        if result or result == "":  # gh pr merge returns empty on success
-            self.log(f"✓ Successfully merged PR #{pr_number}", "SUCCESS")
-            return True
+        self.log(f"Merging PR #{pr.number}: {pr.title}")
+
+        result = self.prs.merge(pr.number, "squash", head_ref=pr.head_ref, delete_branch=True)
+
+        if result.ok:
+            self.log(f"✓ Successfully merged PR #{pr.number} ({result.latency * 1000:.0f}ms)", "SUCCESS")
         else:
-            self.log(f"✗ Failed to merge PR #{pr_number}", "ERROR")
-            return False
+            self.log(f"✗ Failed to merge PR #{pr.number}: {result.error}", "ERROR")
+        return result
+
+    def is_conflict(self, result: CallResult) -> bool:
+        """GitHub answers 405 "Pull Request is not mergeable" when the merge would conflict"""
+        return result.status == 405 and "not mergeable" in result.error.lower()
+
+    def plan_merge_order(self, mergeable_prs: List[PullRequest]) -> Tuple[List[PullRequest], List[PullRequest]]:
+        """
+        Split mergeable PRs into independent ones, safe to merge concurrently, and ones
+        that share changed files and must be merged in order
+        """
+        if len(mergeable_prs) < 2:
+            return mergeable_prs, []
+
+        result = self.prs.changed_files([pr.number for pr in mergeable_prs])
+        if not result.ok:
+            self.log(f"Could not fetch changed files, merging one by one in list order: {result.error}", "WARNING")
+            return [], mergeable_prs
+
+        plan = plan_merges(result.value)
+        self.predicted_conflicts.update(plan.predicted_conflicts)
+
+        by_number = {pr.number: pr for pr in mergeable_prs}
+        self.log(f"Merge plan: {plan.order}")
+        for cluster in plan.clusters:
+            self.log(f"  Overlapping PRs: {cluster}")
+        for path, count in plan.hot_files.items():
+            self.log(f"  Hot file: {path} ({count} PRs)")
+        if plan.predicted_conflicts:
+            self.log(f"  Predicted to conflict: {sorted(plan.predicted_conflicts)}")
+
+        ordered = [by_number[n] for n in plan.order]
+        return ([pr for pr in ordered if pr.number not in plan.predicted_conflicts],
+                [pr for pr in ordered if pr.number in plan.predicted_conflicts])
+
+    def hand_to_auto_merge(self, mergeable_prs: List[PullRequest]) -> List[PullRequest]:
+        """
+        Enable GitHub auto-merge on PRs not handed over yet
+        Returns PRs GitHub reports as already mergeable ("clean status"), which must be merged directly
+        """
+        direct = []
+        for pr in mergeable_prs:
+            if pr.number in self.auto_merge_prs:
+                continue
+            result = self.prs.enable_auto_merge(pr)
+            if result.ok:
+                self.auto_merge_prs.add(pr.number)
+                self.log(f"✓ Auto-merge enabled for PR #{pr.number}")
+            elif "clean status" in result.error.lower():
+                direct.append(pr)
+            else:
+                self.log(f"✗ Could not enable auto-merge for PR #{pr.number}: {result.error}", "ERROR")
+        return direct
+
+    def reschedule(self, open_prs: List[PullRequest]):
+        """Update per-PR poll schedules from a fresh PR list"""
+        open_numbers = {pr.number for pr in open_prs}
+        for number in list(self.schedule.next_poll):
+            if number not in open_numbers:
+                self.schedule.remove(number)
+
+        due = set(self.schedule.due())
+        for pr in open_prs:
+            fingerprint = (pr.mergeable, pr.ci_state, pr.is_draft)
+            known = pr.number in self.schedule.next_poll
+
+            # A PR that is not due yet keeps its schedule unless it changed anyway
+            if known and pr.number not in due and self.schedule.fingerprints.get(pr.number) == fingerprint:
+                continue
+
+            urgent = None
+            if pr.mergeable == 'UNKNOWN':
+                urgent = UNKNOWN_INTERVAL
+            elif pr.ci_state in ('PENDING', 'EXPECTED'):
+                urgent = FAST_INTERVAL
+
+            self.schedule.observe(pr.number, fingerprint, urgent)
 
     def monitor_and_merge(self):
         """Main monitoring loop"""
         self.log("Starting auto-merge monitor...")
-        self.log(f"Will check every {CHECK_INTERVAL} seconds for up to {MAX_ITERATIONS} iterations")
+        self.log(f"Polling each PR on its own schedule ({UNKNOWN_INTERVAL}s for UNKNOWN, "
+                 f"up to {self.schedule.max_interval}s while unchanged) for up to {MAX_RUNTIME // 60} minutes")
+
+        deadline = time.monotonic() + MAX_RUNTIME
 
-        while self.iterations < MAX_ITERATIONS:
+        while time.monotonic() < deadline:
             self.iterations += 1
             self.log(f"\n{'='*80}")
-            self.log(f"Iteration {self.iterations}/{MAX_ITERATIONS}")
+            self.log(f"Iteration {self.iterations}")
             self.log(f"{'='*80}\n")
 
             # Get current PR status
@@ -92,9 +205,17 @@ class AutoMergeMonitor:
                 self.log("No open PRs remaining. All done! 🎉", "SUCCESS")
                 break
 
-            mergeable_prs = [pr for pr in open_prs if pr['mergeable'] == 'MERGEABLE']
-            conflicting_prs = [pr for pr in open_prs if pr['mergeable'] == 'CONFLICTING']
-            unknown_prs = [pr for pr in open_prs if pr['mergeable'] == 'UNKNOWN']
+            self.reschedule(open_prs)
+
+            # PRs handed to auto-merge that left the open list were merged by GitHub
+            for number in sorted(self.auto_merge_prs - set(self.open_prs)):
+                self.auto_merge_prs.discard(number)
+                self.merged_prs.append(number)
+                self.log(f"✓ PR #{number} merged by GitHub auto-merge", "SUCCESS")
+
+            mergeable_prs = [pr for pr in open_prs if pr.mergeable == 'MERGEABLE']
+            conflicting_prs = [pr for pr in open_prs if pr.mergeable == 'CONFLICTING']
+            unknown_prs = [pr for pr in open_prs if pr.mergeable == 'UNKNOWN']
 
             self.log(f"Status: {len(open_prs)} open PRs")
             self.log(f"  - Mergeable: {len(mergeable_prs)}")
@@ -104,26 +225,37 @@ class AutoMergeMonitor:
             # Merge all mergeable PRs
             if mergeable_prs:
                 self.log(f"\nFound {len(mergeable_prs)} mergeable PRs:")
-                for pr in mergeable_prs:
-                    if self.merge_pr(pr['number'], pr['title']):
-                        self.merged_prs.append(pr['number'])
-                    time.sleep(2)  # Brief delay between merges
+                to_merge = self.hand_to_auto_merge(mergeable_prs) if self.auto_merge else mergeable_prs
+                independent, dependent = self.plan_merge_order(to_merge)
+
+                for outcome in self.executor.run(independent, dependent):
+                    pr, result = outcome.pr, outcome.result
+                    self.record_merge(pr, result)
+                    if result.ok:
+                        self.merged_prs.append(pr.number)
+                        self.schedule.remove(pr.number)
+                    elif self.is_conflict(result):
+                        self.actual_conflicts.add(pr.number)
             else:
                 self.log("\nNo mergeable PRs at this time")
 
             # Update conflicting list
-            self.conflicting_prs = [pr['number'] for pr in conflicting_prs]
+            self.conflicting_prs = [pr.number for pr in self.open_prs.values() if pr.mergeable == 'CONFLICTING']
 
-            # Check if we're done
-            remaining_open = self.get_open_prs()
-            if not remaining_open:
+            # Check if we're done, from the state our own merges left behind
+            if not self.open_prs:
                 self.log("\n🎉 All PRs have been merged!", "SUCCESS")
                 break
 
-            # Wait before next check
-            if self.iterations < MAX_ITERATIONS:
-                self.log(f"\nWaiting {CHECK_INTERVAL} seconds before next check...")
-                time.sleep(CHECK_INTERVAL)
+            if any(pr.number in self.merged_prs for pr in mergeable_prs):
+                for pr in self.open_prs.values():
+                    self.schedule.boost(pr.number, UNKNOWN_INTERVAL)
+
+            # Wait until the earliest PR is due
+            wait = min(self.schedule.seconds_until_next(), max(0.0, deadline - time.monotonic()))
+            if wait > 0:
+                self.log(f"\nWaiting {wait:.0f} seconds before next check (due: {self.schedule.due(wait)})...")
+                time.sleep(wait)
 
         # Final summary
         self.print_summary()
@@ -135,19 +267,46 @@ class AutoMergeMonitor:
         self.log("="*80)
 
         self.log(f"\nTotal PRs Merged: {len(self.merged_prs)}")
+        self.log(f"Status checks: {self.iterations} iterations, {self.list_requests} list requests, "
+                 f"{self.schedule.polls} PR checks")
         if self.merged_prs:
             self.log(f"Merged PRs: {self.merged_prs}")
 
-        remaining = self.get_open_prs()
+        elapsed = time.monotonic() - self.started
+        if self.executor.merged:
+            self.log(f"Merge throughput: {self.executor.throughput():.1f} PRs/min over "
+                     f"{self.executor.merge_time:.0f}s of merging ({self.executor.retries} race retries)")
+        if self.merged_prs and elapsed > 0:
+            self.log(f"Overall: {len(self.merged_prs) / (elapsed / 60):.2f} PRs/min over {elapsed / 60:.1f} min")
+
+        if self.predicted_conflicts or self.actual_conflicts:
+            hits = self.predicted_conflicts & self.actual_conflicts
+            self.log(f"\nConflicts: {len(self.predicted_conflicts)} predicted, {len(self.actual_conflicts)} actual, "
+                     f"{len(hits)} predicted correctly")
+            if self.actual_conflicts - self.predicted_conflicts:
+                self.log(f"  Unpredicted: {sorted(self.actual_conflicts - self.predicted_conflicts)}")
+
+        remaining = list(self.open_prs.values())
         if remaining:
-            self.log(f"\nRemaining Open PRs: {len(remaining)}")
+            self.log(f"\nRemaining Open PRs (as of last check): {len(remaining)}")
             for pr in remaining:
-                self.log(f"  - PR #{pr['number']}: {pr['title']} ({pr['mergeable']})")
+                self.log(f"  - PR #{pr.number}: {pr.title} ({pr.mergeable})")
+
+        if self.prs.stats:
+            self.log("\nGitHub call latency:")
+            for line in self.prs.latency_report():
+                self.log(f"  {line}")
 
         self.log("\n" + "="*80)
 
 if __name__ == "__main__":
-    monitor = AutoMergeMonitor()
+    parser = argparse.ArgumentParser(description="Merge PRs as they become ready.")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="Independent PRs merged at once")
+    parser.add_argument("--auto-merge", action="store_true",
+                        help="Enable GitHub auto-merge on ready PRs instead of merging them directly")
+    args = parser.parse_args()
+
+    monitor = AutoMergeMonitor(max_workers=args.workers, auto_merge=args.auto_merge)
     try:
         monitor.monitor_and_merge()
     except KeyboardInterrupt:
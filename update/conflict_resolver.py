@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Conflict Resolver - Update conflicting PR branches with master in parallel
+
+Replaces the one-branch-at-a-time checkout loop in resolve_conflicts.sh:
+- all PR heads and the base branch are fetched with a single git fetch
+- each PR is merged with the base in its own git worktree, so branches are
+  processed concurrently while sharing one object store
+- the number of concurrent worktrees is bounded
+- every PR gets a result: merged and pushed, already up to date, conflicting
+  files, or an error
+
+The git side only needs a local clone and a remote, so it can be exercised
+against a local bare repository.
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+from pr_client import PRClient
+
+REPO = "pixelsock/fuma"
+BASE_BRANCH = "master"
+REMOTE = "origin"
+MAX_WORKERS = 4
+
+@dataclass
+class ResolveResult:
+    number: int
+    branch: str
+    status: str  # merged, up_to_date, conflict or error
+    conflicts: List[str] = field(default_factory=list)
+    message: str = ""
+    duration: float = 0.0
+    pushed: bool = False
+
+class ConflictResolver:
+    """Merges the base branch into many PR branches, one worktree per PR"""
+
+    def __init__(self, repo_dir: str = ".", remote: str = REMOTE, base: str = BASE_BRANCH,
+                 max_workers: int = MAX_WORKERS, push: bool = True):
+        self.repo_dir = os.path.abspath(repo_dir)
+        self.remote = remote
+        self.base = base
+        self.max_workers = max_workers
+        self.push = push
+
+    def log(self, message: str, level: str = "INFO"):
+        """Log message with timestamp"""
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"[{timestamp}] [{level}] {message}")
+        sys.stdout.flush()
+
+    def git(self, *args: str, cwd: Optional[str] = None) -> subprocess.CompletedProcess:
+        return subprocess.run(["git", *args], cwd=cwd or self.repo_dir, capture_output=True, text=True)
+
+    def remote_ref(self, branch: str) -> str:
+        return f"refs/remotes/{self.remote}/{branch}"
+
+    def fetch(self, branches: List[str]) -> subprocess.CompletedProcess:
+        """Fetch the base branch and every PR head in one round trip"""
+        refspecs = [f"+refs/heads/{b}:{self.remote_ref(b)}" for b in [self.base, *branches]]
+        return self.git("fetch", "--no-tags", self.remote, *refspecs)
+
+    def resolve_one(self, number: int, branch: str, worktree_root: str) -> ResolveResult:
+        """Merge the base into one PR branch inside a throwaway worktree"""
+        started = time.monotonic()
+        result = ResolveResult(number=number, branch=branch, status="error")
+        path = os.path.join(worktree_root, f"pr-{number}")
+
+        added = self.git("worktree", "add", "--detach", path, self.remote_ref(branch))
+        if added.returncode != 0:
+            result.message = added.stderr.strip()
+            result.duration = time.monotonic() - started
+            return result
+
+        try:
+            base_ref = self.remote_ref(self.base)
+            if self.git("merge-base", "--is-ancestor", base_ref, "HEAD", cwd=path).returncode == 0:
+                result.status = "up_to_date"
+                return result
+
+            merged = self.git("merge", "-m", f"Merge {self.base} into {branch}", base_ref, cwd=path)
+            if merged.returncode != 0:
+                unmerged = self.git("diff", "--name-only", "--diff-filter=U", cwd=path)
+                result.conflicts = unmerged.stdout.split()
+                result.status = "conflict" if result.conflicts else "error"
+                result.message = (merged.stdout + merged.stderr).strip()
+                self.git("merge", "--abort", cwd=path)
+                return result
+
+            result.status = "merged"
+            if self.push:
+                pushed = self.git("push", self.remote, f"HEAD:refs/heads/{branch}", cwd=path)
+                if pushed.returncode != 0:
+                    result.status = "error"
+                    result.message = pushed.stderr.strip()
+                    return result
+                result.pushed = True
+            return result
+
+        finally:
+            self.git("worktree", "remove", "--force", path)
+            result.duration = time.monotonic() - started
+
+    def resolve(self, branches: Dict[int, str]) -> List[ResolveResult]:
+        """Resolve many PRs concurrently; branches maps PR number to head branch name"""
+        if not branches:
+            return []
+
+        missing = set()
+        fetched = self.fetch(list(branches.values()))
+        if fetched.returncode != 0:
+            # A single deleted branch fails the whole batch; find out which ones are gone
+            self.log(f"Batched git fetch failed, fetching branches one by one: {fetched.stderr.strip()}", "WARNING")
+            missing = {b for b in branches.values() if self.fetch([b]).returncode != 0}
+
+        results = [ResolveResult(n, b, "error", message="could not fetch branch")
+                   for n, b in branches.items() if b in missing]
+
+        worktree_root = tempfile.mkdtemp(prefix="conflict-resolver-")
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = [pool.submit(self.resolve_one, n, b, worktree_root)
+                           for n, b in branches.items() if b not in missing]
+                results.extend(f.result() for f in futures)
+        finally:
+            shutil.rmtree(worktree_root, ignore_errors=True)
+            self.git("worktree", "prune")
+
+        return results
+
+    def print_results(self, results: List[ResolveResult], wall: float):
+        """Per-PR outcome plus totals"""
+        icons = {"merged": "✓", "up_to_date": "=", "conflict": "✗", "error": "⚠"}
+        for r in sorted(results, key=lambda r: r.number):
+            self.log(f"{icons[r.status]} PR #{r.number} ({r.branch}): {r.status} in {r.duration:.1f}s"
+                     + (" [pushed]" if r.pushed else ""))
+            for path in r.conflicts:
+                self.log(f"    conflict: {path}")
+            if r.status == "error" and r.message:
+                self.log(f"    {r.message}")
+
+        counts = {status: sum(1 for r in results if r.status == status) for status in icons}
+        busy = sum(r.duration for r in results)
+        self.log(f"{len(results)} PRs in {wall:.1f}s with {self.max_workers} workers "
+                 f"(sum of per-PR time {busy:.1f}s): " + ", ".join(f"{n} {s}" for s, n in counts.items()))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge master into conflicting PR branches in parallel worktrees.")
+    parser.add_argument("numbers", nargs="*", type=int, help="PR numbers (default: every CONFLICTING open PR)")
+    parser.add_argument("--repo-dir", default=".", help="Local clone to create worktrees from (default: current directory)")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="Worktrees processed at once")
+    parser.add_argument("--base", default=BASE_BRANCH, help=f"Branch to merge into each PR (default: {BASE_BRANCH})")
+    parser.add_argument("--no-push", action="store_true", help="Merge locally but do not push")
+    parser.add_argument("--merge", action="store_true", help="Try to merge each PR on GitHub after pushing")
+    args = parser.parse_args()
+
+    prs = PRClient(REPO, os.environ.get("GITHUB_TOKEN") or subprocess.run(
+        ["gh", "auth", "token"], capture_output=True, text=True).stdout.strip())
+
+    listing = prs.list_prs(state="OPEN")
+    if not listing.ok:
+        print(f"Failed to list PRs: {listing.error}")
+        sys.exit(1)
+
+    if args.numbers:
+        targets = [pr for pr in listing.value if pr.number in args.numbers]
+    else:
+        targets = [pr for pr in listing.value if pr.mergeable == "CONFLICTING"]
+
+    resolver = ConflictResolver(args.repo_dir, base=args.base, max_workers=args.workers, push=not args.no_push)
+    resolver.log(f"Found conflicting PRs: {[pr.number for pr in targets]}")
+
+    started = time.monotonic()
+    results = resolver.resolve({pr.number: pr.head_ref for pr in targets})
+    resolver.print_results(results, time.monotonic() - started)
+
+    if args.merge:
+        for r in results:
+            if r.pushed:
+                merged = prs.merge(r.number, "squash", head_ref=r.branch, delete_branch=True)
+                resolver.log(f"PR #{r.number}: " + ("merged" if merged.ok else f"still not mergeable ({merged.error})"))
+
+    sys.exit(0 if all(r.status in ("merged", "up_to_date") for r in results) else 1)
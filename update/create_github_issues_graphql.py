@@ -4,14 +4,15 @@ Create GitHub issues from Pastel comments CSV with Copilot agent assignment
 Uses GraphQL API for copilot-swe-agent assignments
 """
 
-import csv
+import argparse
 import os
 import sys
-import time
-import requests
 import subprocess
-import re
-from urllib.parse import urlparse
+from github_client import GitHubClient, chunked
+from issue_index import IssueIndex
+from screenshot_cache import ScreenshotCache
+from issue_pipeline import Stage, run as run_pipeline
+from pastel_issues import CSV_FILE, read_comment_rows, comment_id_from_url, generate_issue_title, build_issue_body
 
 # Configuration
 def get_github_token():
@@ -30,28 +31,21 @@ def get_github_token():
 GITHUB_TOKEN = get_github_token()
 REPO_OWNER = 'pixelsock'
 REPO_NAME = 'fuma'
-CSV_FILE = 'pastel-comments.csv'
 SCREENSHOTS_DIR = 'github_screenshots'
 COPILOT_BOT_ID = 'BOT_kgDOC9w8XQ'
+POOL_SIZE = 10
+BATCH_SIZE = 25
+DOWNLOAD_WORKERS = 8
+CREATE_WORKERS = 2
+COMMENT_WORKERS = 2
+INSTRUCTION_COMMENT = 'The area requiring changes is highlighted with a light purple circle indicator in the screenshot.'
+ISSUE_SELECTION = '{ issue { id number title url assignees(first: 10) { nodes { login } } } }'
 
-def graphql_query(query, variables=None):
-    """Execute GraphQL query"""
-    headers = {
-        'Authorization': f'bearer {GITHUB_TOKEN}',
-        'Content-Type': 'application/json'
-    }
-
-    payload = {'query': query}
-    if variables:
-        payload['variables'] = variables
+CLIENT = GitHubClient(GITHUB_TOKEN, pool_size=POOL_SIZE)
 
-    response = requests.post(
-        'https://api.github.com/graphql',
-        json=payload,
-        headers=headers
-    )
-    response.raise_for_status()
-    return response.json()
+def graphql_query(query, variables=None):
+    """Execute GraphQL query over the shared pooled session"""
+    return CLIENT.graphql(query, variables)
 
 def get_repository_id():
     """Get repository GraphQL ID"""
@@ -66,69 +60,29 @@ def get_repository_id():
     result = graphql_query(query)
     return result['data']['repository']['id']
 
-def download_screenshot(url, filename):
-    """Download screenshot from Pastel"""
-    try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-
-        os.makedirs(SCREENSHOTS_DIR, exist_ok=True)
-        filepath = os.path.join(SCREENSHOTS_DIR, filename)
-
-        with open(filepath, 'wb') as f:
-            f.write(response.content)
-
-        print(f'  Downloaded: {filename}')
-        return filepath
-    except Exception as e:
-        print(f'  Error downloading screenshot: {e}')
-        return None
-
-def extract_page_context(page_url):
-    """Extract readable page context from URL"""
-    path = urlparse(page_url).path
-    parts = [p for p in path.split('/') if p and p != 'articles']
-
-    if not parts:
-        return 'Home Page', 'home'
+def open_screenshot_cache(rows):
+    """Open the screenshot cache, registering files saved as comment_N.jpg by earlier runs"""
+    cache = ScreenshotCache(SCREENSHOTS_DIR, max_workers=DOWNLOAD_WORKERS)
 
-    page_slug = parts[-1]
-    page_name = page_slug.replace('-', ' ').title()
+    for row in rows:
+        legacy_path = os.path.join(SCREENSHOTS_DIR, f'comment_{row["Comment Number"]}.jpg')
+        cache.adopt(row['Screenshot URL'], legacy_path)
 
-    return page_name, page_slug
+    return cache
 
-def generate_issue_title(comment_text, page_url):
-    """Generate a descriptive title for the GitHub issue"""
-    page_name, _ = extract_page_context(page_url)
+def download_screenshots(rows):
+    """Download screenshots for CSV rows concurrently through the content-addressed cache"""
+    cache = open_screenshot_cache(rows)
+    paths = cache.fetch_all(row['Screenshot URL'] for row in rows)
+    print(f'  Screenshots: {cache.stats["downloaded"]} downloaded, '
+          f'{cache.stats["not_modified"]} unchanged, {cache.stats["failed"]} failed\n')
+    return paths
 
-    # Create a concise title from the comment
-    lines = comment_text.strip().split('\n')
-    title_text = lines[0]
-
-    # Truncate if too long
-    if len(title_text) > 50:
-        title_text = title_text[:47] + '...'
-
-    # Clean up quotes and special chars
-    title_text = title_text.replace('"', '').replace("'", '')
-
-    return f'{page_name}: {title_text}'
-
-def create_issue_with_copilot(repo_id, title, body, screenshot_url, screen_size):
+def create_issue_with_copilot(repo_id, title, body, screenshot_url, screen_size, comment_url=None):
     """Create issue and assign to copilot-swe-agent using GraphQL"""
 
-    # Parse screen size
-    width, height = '1605', '851'
-    if screen_size and 'x' in screen_size:
-        try:
-            w, h = screen_size.split(' x ')
-            width, height = w.strip(), h.strip()
-        except:
-            pass
-
     # Build issue body with screenshot
-    issue_body = f'{body}\\n\\n'
-    issue_body += f'<img width="{width}" height="{height}" alt="Image" src="{screenshot_url}" />'
+    issue_body = build_issue_body(body, screenshot_url, screen_size, comment_url)
 
     # Create issue with copilot-swe-agent assigned
     mutation = '''
@@ -195,53 +149,151 @@ def add_comment_to_issue(issue_id, comment_body):
     result = graphql_query(mutation, variables)
     return 'errors' not in result
 
-def get_existing_issues():
-    """Get existing issues from repository"""
-    query = '''
-    query($owner: String!, $name: String!, $cursor: String) {
-      repository(owner: $owner, name: $name) {
-        issues(first: 100, after: $cursor) {
-          pageInfo {
-            hasNextPage
-            endCursor
-          }
-          nodes {
-            number
-            body
-          }
+def create_issues_batch(repo_id, issues):
+    """
+    Create several issues in one request using aliased createIssue mutations
+    issues is a list of {'title', 'body'} dicts; returns one aliased result per issue
+    """
+    inputs = [
+        {
+            'repositoryId': repo_id,
+            'title': issue['title'],
+            'body': issue['body'],
+            'assigneeIds': [COPILOT_BOT_ID]
         }
-      }
-    }
-    '''
+        for issue in issues
+    ]
 
-    existing = {}
-    cursor = None
+    return CLIENT.aliased_mutation('createIssue', 'CreateIssueInput', inputs, ISSUE_SELECTION, alias_prefix='i')
 
-    while True:
-        variables = {
-            'owner': REPO_OWNER,
-            'name': REPO_NAME,
-            'cursor': cursor
-        }
+def add_comments_batch(issue_ids, comment_body):
+    """Add the same comment to several issues in one request using aliased addComment mutations"""
+    inputs = [{'subjectId': issue_id, 'body': comment_body} for issue_id in issue_ids]
+    return CLIENT.aliased_mutation('addComment', 'AddCommentInput', inputs, '{ commentEdge { node { id } } }', alias_prefix='c')
 
-        result = graphql_query(query, variables)
-        issues = result['data']['repository']['issues']
+def create_issues_in_batches(repo_id, rows, batch_size):
+    """Create issues for CSV rows batch_size at a time, then add instruction comments in a follow-up batch"""
+    created_count = 0
 
-        for issue in issues['nodes']:
-            if issue['body'] and 'usepastel.com' in issue['body']:
-                match = re.search(r'/comment/(\d+)/', issue['body'])
-                if match:
-                    comment_id = match.group(1)
-                    existing[comment_id] = issue['number']
+    for batch in chunked(rows, batch_size):
+        issues = [
+            {
+                'title': generate_issue_title(row['Comment Text'], row['Original URL']),
+                'body': build_issue_body(row['Comment Text'], row['Screenshot URL'], row['Metadata - Screen Size'],
+                                         row['Comment URL'])
+            }
+            for row in batch
+        ]
 
-        if not issues['pageInfo']['hasNextPage']:
-            break
+        print(f'Creating batch of {len(batch)} issues...')
+        try:
+            results = create_issues_batch(repo_id, issues)
+        except Exception as e:
+            print(f'  ✗ Error: {e}\n')
+            continue
+
+        created_ids = []
+        for row, issue, result in zip(batch, issues, results):
+            payload = result['data']
+            if payload is None:
+                print(f'  ✗ [{result["alias"]}] comment #{row["Comment Number"]}: {result["errors"]}')
+                continue
+
+            issue_data = payload['issue']
+            assignees = [a['login'] for a in issue_data['assignees']['nodes']]
+            print(f'  ✓ [{result["alias"]}] Created issue #{issue_data["number"]}: {issue["title"]}')
+            print(f'    Assigned to: {", ".join(assignees)}')
+            created_ids.append(issue_data['id'])
+
+        created_count += len(created_ids)
+
+        if created_ids:
+            try:
+                comment_results = add_comments_batch(created_ids, INSTRUCTION_COMMENT)
+                added = [r for r in comment_results if r['data'] is not None]
+                print(f'  ✓ Added instruction comment to {len(added)}/{len(created_ids)} issues')
+                for r in comment_results:
+                    if r['data'] is None:
+                        print(f'  ✗ [{r["alias"]}] Comment error: {r["errors"]}')
+            except Exception as e:
+                print(f'  ✗ Error adding comments: {e}')
+
+        print('')
+
+    return created_count
+
+def create_issues_pipelined(repo_id, rows):
+    """
+    Create issues with download, title, createIssue and addComment running as
+    overlapping stages joined by bounded queues
+    """
+    cache = open_screenshot_cache(rows)
+
+    def download(item):
+        cache.fetch(item['row']['Screenshot URL'])
+        return item
+
+    def prepare(item):
+        row = item['row']
+        item['title'] = generate_issue_title(row['Comment Text'], row['Original URL'])
+        return item
+
+    def create(item):
+        row = item['row']
+        issue_data = create_issue_with_copilot(
+            repo_id=repo_id,
+            title=item['title'],
+            body=row['Comment Text'],
+            screenshot_url=row['Screenshot URL'],
+            screen_size=row['Metadata - Screen Size'],
+            comment_url=row['Comment URL']
+        )
+        if not issue_data:
+            return None
+
+        print(f'✓ Created issue #{issue_data["number"]} for comment #{row["Comment Number"]}: {item["title"]}')
+        item['issue'] = issue_data
+        return item
+
+    def comment(item):
+        if add_comment_to_issue(item['issue']['id'], INSTRUCTION_COMMENT):
+            print(f'  ✓ Added instruction comment to issue #{item["issue"]["number"]}')
+        return item
+
+    create_stage = Stage('create', create, concurrency=CREATE_WORKERS)
+    stages = [
+        Stage('download', download, concurrency=DOWNLOAD_WORKERS),
+        Stage('title', prepare),
+        create_stage,
+        Stage('comment', comment, concurrency=COMMENT_WORKERS)
+    ]
+
+    run_pipeline([{'row': row} for row in rows], stages)
+    cache.save()
+    # An issue whose instruction comment failed was still created
+    return create_stage.processed
 
-        cursor = issues['pageInfo']['endCursor']
+def get_existing_issues():
+    """Get existing issues from the local index, refreshed incrementally"""
+    index = IssueIndex()
+    refreshed = index.refresh(CLIENT, REPO_OWNER, REPO_NAME)
+    print(f'  Refreshed {refreshed} issues updated since last run')
 
+    existing = index.as_dict()
+    index.close()
     return existing
 
 def main():
+    ap = argparse.ArgumentParser(description='Create GitHub issues from Pastel comments with Copilot assigned.')
+    ap.add_argument('--batch', action='store_true', help='Create issues with aliased batched mutations instead of one request per row')
+    ap.add_argument('--pipeline', action='store_true', help='Overlap download, create and comment stages across rows')
+    ap.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Issues per batched request with --batch (default: %(default)s)')
+    args = ap.parse_args()
+
+    # The pipeline creates one issue per request with its own stage worker counts
+    if args.pipeline and (args.batch or args.batch_size != BATCH_SIZE):
+        ap.error('--batch/--batch-size cannot be combined with --pipeline')
+
     if not GITHUB_TOKEN:
         print('Error: GitHub authentication not found')
         print('Please authenticate with: gh auth login')
@@ -268,35 +320,40 @@ def main():
     created_count = 0
     skipped_count = 0
     total_count = 0
+    pending_rows = []
 
-    with open(CSV_FILE, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
+    for row in read_comment_rows(CSV_FILE):
+        total_count += 1
+        comment_number = row['Comment Number']
 
-        for row in reader:
-            total_count += 1
-            comment_number = row['Comment Number']
-            pastel_url = row['Comment URL']
+        # Extract comment ID from Pastel URL
+        comment_id = comment_id_from_url(row['Comment URL'])
 
-            # Extract comment ID from Pastel URL
-            match = re.search(r'/comment/(\d+)/', pastel_url)
-            comment_id = match.group(1) if match else None
+        # Skip if already created
+        if comment_id and comment_id in existing_issues:
+            print(f'[{total_count}] Skipping comment #{comment_number} (already exists as issue #{existing_issues[comment_id]})')
+            skipped_count += 1
+            continue
 
-            # Skip if already created
-            if comment_id and comment_id in existing_issues:
-                print(f'[{total_count}] Skipping comment #{comment_number} (already exists as issue #{existing_issues[comment_id]})')
-                skipped_count += 1
-                continue
+        pending_rows.append(row)
+
+    if pending_rows and not args.pipeline:
+        print(f'\nDownloading {len(pending_rows)} screenshots...')
+        download_screenshots(pending_rows)
 
+    if args.pipeline:
+        created_count += create_issues_pipelined(repo_id, pending_rows)
+    elif args.batch:
+        created_count += create_issues_in_batches(repo_id, pending_rows, args.batch_size)
+    else:
+        for row in pending_rows:
+            comment_number = row['Comment Number']
             comment_text = row['Comment Text']
             screenshot_url = row['Screenshot URL']
             original_url = row['Original URL']
             screen_size = row['Metadata - Screen Size']
 
-            print(f'[{total_count}] Processing comment #{comment_number}...')
-
-            # Download screenshot
-            screenshot_filename = f'comment_{comment_number}.jpg'
-            download_screenshot(screenshot_url, screenshot_filename)
+            print(f'Processing comment #{comment_number}...')
 
             # Generate issue title
             title = generate_issue_title(comment_text, original_url)
@@ -308,7 +365,8 @@ def main():
                     title=title,
                     body=comment_text,
                     screenshot_url=screenshot_url,
-                    screen_size=screen_size
+                    screen_size=screen_size,
+                    comment_url=row['Comment URL']
                 )
 
                 if issue_data:
@@ -321,8 +379,7 @@ def main():
                     print(f'  ✓ Assigned to: {", ".join(assignees)}')
 
                     # Add instruction comment
-                    instruction = 'The area requiring changes is highlighted with a light purple circle indicator in the screenshot.'
-                    if add_comment_to_issue(issue_data['id'], instruction):
+                    if add_comment_to_issue(issue_data['id'], INSTRUCTION_COMMENT):
                         print(f'  ✓ Added instruction comment')
 
                     created_count += 1
@@ -332,9 +389,6 @@ def main():
                 print(f'  ✗ Error: {e}')
                 print('')
 
-            # Rate limiting
-            time.sleep(3)
-
     print(f'═══════════════════════════════════════')
     print(f'✓ Complete!')
     print(f'  Created: {created_count} new issues')
@@ -342,6 +396,8 @@ def main():
     print(f'  Total: {total_count} comments processed')
     print(f'  Repository: https://github.com/{REPO_OWNER}/{REPO_NAME}/issues')
     print(f'  Screenshots: {SCREENSHOTS_DIR}/')
+    CLIENT.print_timing_summary()
+    CLIENT.close()
 
 if __name__ == '__main__':
     main()
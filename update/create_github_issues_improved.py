@@ -7,13 +7,14 @@ Uses PyGithub library for better GitHub API integration
 import csv
 import os
 import sys
-import time
 import requests
 import subprocess
-from urllib.parse import urlparse
 from github import Github
 from github.GithubException import GithubException
 import base64
+from rate_limiter import RateLimitScheduler
+from issue_index import IssueIndex
+from pastel_issues import extract_page_context, generate_issue_title
 
 # Configuration
 def get_github_token():
@@ -41,6 +42,14 @@ REPO_NAME = 'fuma'
 CSV_FILE = 'pastel-comments.csv'
 SCREENSHOTS_DIR = 'github_screenshots'
 
+SCHEDULER = RateLimitScheduler()
+
+def pace_write(g):
+    """Wait for write budget, refreshing the primary budget from PyGithub's last response"""
+    remaining, _ = g.rate_limiting
+    SCHEDULER.update_budget(remaining, g.rate_limiting_resettime)
+    SCHEDULER.acquire(write=True)
+
 def download_screenshot(url, filename):
     """Download screenshot from Pastel"""
     try:
@@ -59,36 +68,6 @@ def download_screenshot(url, filename):
         print(f'  Error downloading screenshot: {e}')
         return None
 
-def extract_page_context(page_url):
-    """Extract readable page context from URL"""
-    path = urlparse(page_url).path
-    parts = [p for p in path.split('/') if p and p != 'articles']
-
-    if not parts:
-        return 'Home Page', 'home'
-
-    page_slug = parts[-1]
-    page_name = page_slug.replace('-', ' ').title()
-
-    return page_name, page_slug
-
-def generate_issue_title(comment_text, page_url):
-    """Generate a descriptive title for the GitHub issue"""
-    page_name, _ = extract_page_context(page_url)
-
-    # Create a concise title from the comment
-    lines = comment_text.strip().split('\n')
-    title_text = lines[0]
-
-    # Truncate if too long
-    if len(title_text) > 50:
-        title_text = title_text[:47] + '...'
-
-    # Clean up quotes and special chars
-    title_text = title_text.replace('"', '').replace("'", '')
-
-    return f'{page_name}: {title_text}'
-
 def upload_to_github_repo(g, repo, image_path, issue_number):
     """
     Upload image to repository as an asset so it can be referenced in the issue
@@ -151,6 +130,7 @@ def create_github_issue_with_screenshot(g, repo, title, body, screenshot_url, co
         issue_body += f'<img width="{width}" height="{height}" alt="Image" src="{screenshot_url}" />\n\n'
 
         # Create the issue first and assign to copilot
+        pace_write(g)
         issue = repo.create_issue(
             title=title,
             body=issue_body,
@@ -163,6 +143,7 @@ def create_github_issue_with_screenshot(g, repo, title, body, screenshot_url, co
 
         # Add instruction comment about the purple circle indicator
         instruction_comment = 'The area requiring changes is highlighted with a light purple circle indicator in the screenshot.'
+        pace_write(g)
         issue.create_comment(instruction_comment)
         print(f'  ✓ Added instruction comment')
 
@@ -208,19 +189,11 @@ def main():
 
     # Get existing issues to avoid duplicates
     print('Checking for existing issues...')
-    existing_issues = {}
-    for issue in repo.get_issues(state='all'):
-        # Extract comment number from issue if it was created by this script
-        if 'Pastel Comment:' in issue.body:
-            try:
-                # Parse the Pastel URL to get comment number
-                import re
-                match = re.search(r'/comment/(\d+)/', issue.body)
-                if match:
-                    comment_id = match.group(1)
-                    existing_issues[comment_id] = issue.number
-            except:
-                pass
+    index = IssueIndex()
+    refreshed = index.refresh_from_repo(repo)
+    print(f'  Refreshed {refreshed} issues updated since last run')
+    existing_issues = index.as_dict()
+    index.close()
 
     print(f'Found {len(existing_issues)} existing issues from Pastel comments\n')
     print(f'Reading comments from {CSV_FILE}...\n')
@@ -275,9 +248,6 @@ def main():
 
             print('')  # Blank line between issues
 
-            # Rate limiting - be nice to GitHub API
-            time.sleep(3)
-
     print(f'═══════════════════════════════════════')
     print(f'✓ Complete!')
     print(f'  Created: {created_count} new issues')
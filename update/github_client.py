@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Shared GitHub API client for the update/ scripts
+Holds one pooled keep-alive requests.Session so the TLS handshake is paid once per run
+"""
+
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from rate_limiter import RateLimitScheduler, SECONDARY_LIMIT_DELAY
+
+GITHUB_API_URL = 'https://api.github.com'
+GRAPHQL_URL = 'https://api.github.com/graphql'
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = 30
+MAX_RETRIES = 3
+
+def chunked(items, size):
+    """Yield successive lists of at most size items"""
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def document_errors(result, aliases):
+    """Errors of an aliased GraphQL response that no alias's path points at, e.g. a timeout"""
+    return [e for e in result.get('errors', []) if (e.get('path') or [None])[0] not in aliases]
+
+def split_aliased_result(result, aliases):
+    """
+    Split an aliased GraphQL response into one entry per alias
+    An alias succeeded when its data payload is present; errors are attributed to an alias by
+    the first element of their path. Document-level errors are only given to aliases that have
+    no payload and no error of their own, so a mutation that went through is never failed by them
+    """
+    data = result.get('data') or {}
+    errors = {alias: [] for alias in aliases}
+    unattributed = document_errors(result, aliases)
+
+    for error in result.get('errors', []):
+        path = error.get('path') or []
+        if path and path[0] in errors:
+            errors[path[0]].append(error)
+
+    return [
+        {
+            'alias': alias,
+            'data': data.get(alias),
+            'errors': errors[alias] or (unattributed if data.get(alias) is None else [])
+        }
+        for alias in aliases
+    ]
+
+class GitHubClient:
+    """Pooled HTTP client for the GitHub REST and GraphQL APIs"""
+
+    def __init__(self, token, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT, keep_alive=True,
+                 scheduler=None, max_retries=MAX_RETRIES):
+        self.timeout = timeout
+        self.timings = []
+        self.scheduler = scheduler or RateLimitScheduler()
+        self.max_retries = max_retries
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'Authorization': f'bearer {token}',
+            'Accept': 'application/vnd.github+json',
+            'Connection': 'keep-alive' if keep_alive else 'close'
+        })
+
+    def request(self, method, url, write=None, **kwargs):
+        """
+        Send a request through the pooled session and record its latency
+        Waits on the rate-limit scheduler first and retries rate-limited responses
+        write is the number of write tokens the request costs; by default one for any non-GET
+        """
+        if not url.startswith('http'):
+            url = f'{GITHUB_API_URL}{url}'
+        if write is None:
+            write = method != 'GET'
+        resource = 'graphql' if url == GRAPHQL_URL else 'core'
+        kwargs.setdefault('timeout', self.timeout)
+
+        for attempt in range(self.max_retries + 1):
+            self.scheduler.acquire(write=write, resource=resource)
+
+            start = time.perf_counter()
+            response = self.session.request(method, url, **kwargs)
+            elapsed = time.perf_counter() - start
+
+            self.timings.append({
+                'method': method,
+                'url': url,
+                'status': response.status_code,
+                'elapsed': elapsed
+            })
+
+            self.scheduler.update_from_headers(response.headers)
+            delay = self.scheduler.retry_delay(response)
+            if delay is None or attempt == self.max_retries:
+                return response
+
+            print(f'  Rate limited, retrying in {delay:.0f}s...')
+            self.scheduler.pause(delay)
+
+        return response
+
+    def graphql(self, query, variables=None, write=None):
+        """Execute GraphQL query; mutations cost one write token unless write says otherwise"""
+        payload = {'query': query}
+        if variables:
+            payload['variables'] = variables
+
+        if write is None:
+            write = query.lstrip().startswith('mutation')
+
+        for attempt in range(self.max_retries + 1):
+            response = self.request('POST', GRAPHQL_URL, write=write, json=payload)
+            response.raise_for_status()
+            result = response.json()
+
+            self.scheduler.update_from_graphql((result.get('data') or {}).get('rateLimit'))
+
+            rate_limited = any(e.get('type') == 'RATE_LIMITED' for e in result.get('errors', []))
+            if not rate_limited or attempt == self.max_retries:
+                return result
+
+            self.scheduler.pause(SECONDARY_LIMIT_DELAY)
+
+        return result
+
+    def aliased_mutation(self, field, input_type, inputs, selection, alias_prefix='m'):
+        """
+        Run one mutation per input in a single document, e.g.
+        m0: createIssue(input: $m0) { ... } m1: createIssue(input: $m1) { ... }
+        Returns one {'alias', 'data', 'errors'} entry per input, in order
+        Each mutation takes its own write token, so batching doesn't outrun the write limit
+        Check an entry's data, not its errors, to tell whether that mutation went through
+        """
+        aliases = [f'{alias_prefix}{i}' for i in range(len(inputs))]
+        params = ', '.join(f'${alias}: {input_type}!' for alias in aliases)
+        fields = '\n'.join(f'  {alias}: {field}(input: ${alias}) {selection}' for alias in aliases)
+        document = f'mutation({params}) {{\n{fields}\n}}'
+
+        result = self.graphql(document, dict(zip(aliases, inputs)), write=len(inputs))
+
+        unattributed = document_errors(result, aliases)
+        if unattributed:
+            print(f'  ! {field} request errors: {[e.get("message", e) for e in unattributed]}')
+
+        return split_aliased_result(result, aliases)
+
+    def timing_summary(self):
+        """Return request count and latency totals for this run"""
+        elapsed = [t['elapsed'] for t in self.timings]
+        if not elapsed:
+            return {'requests': 0, 'total': 0.0, 'average': 0.0, 'max': 0.0}
+
+        return {
+            'requests': len(elapsed),
+            'total': sum(elapsed),
+            'average': sum(elapsed) / len(elapsed),
+            'max': max(elapsed)
+        }
+
+    def print_timing_summary(self):
+        """Print request count and latency totals for this run"""
+        summary = self.timing_summary()
+        print(f'  API requests: {summary["requests"]} '
+              f'(total {summary["total"]:.1f}s, avg {summary["average"] * 1000:.0f}ms, '
+              f'max {summary["max"] * 1000:.0f}ms)')
+        print(f'  Rate-limit wait: {self.scheduler.total_wait:.1f}s')
+
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
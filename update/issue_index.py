@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Persistent local index of Pastel comment ID -> GitHub issue number
+Refreshed incrementally from a stored updatedAt watermark, so startup cost stays
+flat as the repository grows instead of re-reading every issue body each run
+"""
+
+import re
+import sqlite3
+from datetime import datetime
+
+INDEX_FILE = 'issue_index.sqlite3'
+PASTEL_COMMENT_PATTERN = re.compile(r'/comment/(\d+)/')
+PASTEL_SCREENSHOT_PATTERN = re.compile(r'src="(https://user-assets\.usepastel\.com/[^"]+)"')
+
+REFRESH_QUERY = '''
+query($owner: String!, $name: String!, $cursor: String, $since: DateTime) {
+  rateLimit {
+    cost
+    remaining
+    resetAt
+  }
+  repository(owner: $owner, name: $name) {
+    issues(first: 100, after: $cursor, filterBy: {since: $since}, orderBy: {field: UPDATED_AT, direction: ASC}) {
+      pageInfo {
+        hasNextPage
+        endCursor
+      }
+      nodes {
+        number
+        state
+        updatedAt
+        body
+      }
+    }
+  }
+}
+'''
+
+def extract_comment_id(text):
+    """Return the Pastel comment ID referenced in text, or None"""
+    if not text or ('usepastel.com' not in text and 'Pastel Comment:' not in text):
+        return None
+
+    match = PASTEL_COMMENT_PATTERN.search(text)
+    return match.group(1) if match else None
+
+def extract_screenshot_url(text):
+    """Return the Pastel screenshot URL embedded in text, or None"""
+    match = PASTEL_SCREENSHOT_PATTERN.search(text or '')
+    return match.group(1) if match else None
+
+class IssueIndex:
+    """SQLite-backed map of Pastel comment ID to issue number and state"""
+
+    def __init__(self, path=INDEX_FILE):
+        self.conn = sqlite3.connect(path)
+        has_screenshots = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'screenshots'"
+        ).fetchone()
+
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS issues (
+                comment_id TEXT PRIMARY KEY,
+                number INTEGER NOT NULL,
+                state TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS issues_number ON issues (number);
+            CREATE TABLE IF NOT EXISTS screenshots (
+                url TEXT PRIMARY KEY,
+                number INTEGER NOT NULL,
+                state TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS screenshots_number ON screenshots (number);
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        ''')
+
+        # Indexes written before the screenshots table existed need one full rebuild
+        if not has_screenshots:
+            self.conn.execute("DELETE FROM meta WHERE key = 'watermark'")
+            self.conn.commit()
+
+    def get_watermark(self):
+        """Return the updatedAt of the newest issue seen so far, or None"""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'watermark'").fetchone()
+        return row[0] if row else None
+
+    def set_watermark(self, value):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('watermark', ?)",
+            (value,)
+        )
+
+    def record(self, number, state, updated_at, body):
+        """Index one issue, dropping any stale entry if its body no longer references a comment"""
+        self.conn.execute('DELETE FROM issues WHERE number = ?', (number,))
+        self.conn.execute('DELETE FROM screenshots WHERE number = ?', (number,))
+
+        screenshot_url = extract_screenshot_url(body)
+        if screenshot_url:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO screenshots (url, number, state) VALUES (?, ?, ?)',
+                (screenshot_url, number, state)
+            )
+
+        comment_id = extract_comment_id(body)
+        if comment_id:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO issues (comment_id, number, state, updated_at) VALUES (?, ?, ?, ?)',
+                (comment_id, number, state, updated_at)
+            )
+
+    def refresh(self, client, owner, name):
+        """Fetch only issues updated since the stored watermark; returns how many were seen"""
+        since = self.get_watermark()
+        watermark = since
+        cursor = None
+        seen = 0
+
+        while True:
+            variables = {
+                'owner': owner,
+                'name': name,
+                'cursor': cursor,
+                'since': since
+            }
+
+            result = client.graphql(REFRESH_QUERY, variables)
+            issues = result['data']['repository']['issues']
+
+            for issue in issues['nodes']:
+                self.record(issue['number'], issue['state'], issue['updatedAt'], issue['body'])
+                watermark = max(watermark or '', issue['updatedAt'])
+                seen += 1
+
+            if not issues['pageInfo']['hasNextPage']:
+                break
+
+            cursor = issues['pageInfo']['endCursor']
+
+        if watermark:
+            self.set_watermark(watermark)
+        self.conn.commit()
+        return seen
+
+    def refresh_from_repo(self, repo):
+        """Same as refresh, for scripts that talk to GitHub through a PyGithub Repository"""
+        since = self.get_watermark()
+        watermark = since
+        seen = 0
+
+        kwargs = {'state': 'all', 'sort': 'updated', 'direction': 'asc'}
+        if since:
+            kwargs['since'] = datetime.fromisoformat(since.replace('Z', '+00:00'))
+
+        for issue in repo.get_issues(**kwargs):
+            if issue.pull_request:
+                continue
+
+            updated_at = issue.updated_at.strftime('%Y-%m-%dT%H:%M:%SZ')
+            self.record(issue.number, issue.state.upper(), updated_at, issue.body)
+            watermark = max(watermark or '', updated_at)
+            seen += 1
+
+        if watermark:
+            self.set_watermark(watermark)
+        self.conn.commit()
+        return seen
+
+    def lookup(self, comment_id):
+        """Return the issue number for a Pastel comment ID, or None"""
+        row = self.conn.execute('SELECT number FROM issues WHERE comment_id = ?', (comment_id,)).fetchone()
+        return row[0] if row else None
+
+    def as_dict(self, state=None):
+        """Return {comment_id: issue_number}, optionally limited to OPEN or CLOSED issues"""
+        if state:
+            rows = self.conn.execute('SELECT comment_id, number FROM issues WHERE state = ?', (state,))
+        else:
+            rows = self.conn.execute('SELECT comment_id, number FROM issues')
+        return dict(rows.fetchall())
+
+    def screenshots_as_dict(self, state=None):
+        """Return {screenshot_url: issue_number} for issues that embed a Pastel screenshot"""
+        if state:
+            rows = self.conn.execute('SELECT url, number FROM screenshots WHERE state = ?', (state,))
+        else:
+            rows = self.conn.execute('SELECT url, number FROM screenshots')
+        return dict(rows.fetchall())
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Pipelined async engine for issue creation
+Each stage has its own worker count and is joined to the next by a bounded
+queue, so network-bound stages overlap across rows and a slow stage applies
+backpressure upstream. Wall time tracks the slowest stage, not the sum.
+Stages run on a thread pool sized to their combined worker count, so asyncio's
+default executor (capped at min(32, cpus + 4)) never limits the configured concurrency.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUE_SIZE = 10
+
+class Stage:
+    """
+    One pipeline step
+    func is a blocking callable run in a worker thread; it takes an item and returns
+    the item for the next stage, or None to drop it
+    """
+
+    def __init__(self, name, func, concurrency=1):
+        self.name = name
+        self.func = func
+        self.concurrency = concurrency
+        self.processed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.busy = 0.0
+
+    def summary(self):
+        return (f'{self.name}: {self.processed} ok, {self.dropped} dropped, {self.failed} failed, '
+                f'busy {self.busy:.1f}s across {self.concurrency} workers')
+
+_DONE = object()
+
+async def _worker(stage, inbound, outbound, executor):
+    loop = asyncio.get_running_loop()
+    while True:
+        item = await inbound.get()
+        if item is _DONE:
+            return
+
+        start = time.perf_counter()
+        try:
+            result = await loop.run_in_executor(executor, stage.func, item)
+        except Exception as e:
+            print(f'  ✗ [{stage.name}] {e}')
+            stage.failed += 1
+            continue
+        finally:
+            stage.busy += time.perf_counter() - start
+
+        if result is None:
+            stage.dropped += 1
+            continue
+
+        stage.processed += 1
+        await outbound.put(result)
+
+async def _run_stage(stage, inbound, outbound, next_concurrency, executor):
+    workers = [asyncio.create_task(_worker(stage, inbound, outbound, executor)) for _ in range(stage.concurrency)]
+    await asyncio.gather(*workers)
+    for _ in range(next_concurrency):
+        await outbound.put(_DONE)
+
+async def _feed(items, queue, concurrency):
+    for item in items:
+        await queue.put(item)
+    for _ in range(concurrency):
+        await queue.put(_DONE)
+
+async def _collect(queue, results):
+    while True:
+        item = await queue.get()
+        if item is _DONE:
+            return
+        results.append(item)
+
+async def run_pipeline(items, stages, queue_size=QUEUE_SIZE):
+    """Push items through stages; returns the items that left the last stage"""
+    queues = [asyncio.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)]
+    results = []
+
+    with ThreadPoolExecutor(max_workers=sum(s.concurrency for s in stages)) as executor:
+        tasks = [asyncio.create_task(_feed(items, queues[0], stages[0].concurrency))]
+        for i, stage in enumerate(stages):
+            next_concurrency = stages[i + 1].concurrency if i + 1 < len(stages) else 1
+            tasks.append(asyncio.create_task(_run_stage(stage, queues[i], queues[i + 1], next_concurrency, executor)))
+        tasks.append(asyncio.create_task(_collect(queues[-1], results)))
+
+        await asyncio.gather(*tasks)
+    return results
+
+def run(items, stages, queue_size=QUEUE_SIZE):
+    """Synchronous entry point; prints per-stage and wall-clock timing"""
+    start = time.perf_counter()
+    results = asyncio.run(run_pipeline(items, stages, queue_size))
+    wall = time.perf_counter() - start
+
+    print('Pipeline stages:')
+    for stage in stages:
+        print(f'  {stage.summary()}')
+    print(f'  Wall time: {wall:.1f}s (sum of stage busy time: {sum(s.busy for s in stages):.1f}s)')
+    return results
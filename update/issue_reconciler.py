@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Reconcile GitHub issues with the Pastel comments CSV
+Builds the desired state for every Pastel row (title, <img> body, Copilot assignee,
+instruction comment), fetches the current state in bulk and applies only the delta
+with batched mutations. Run with --plan to print the change plan without writing.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from github_client import GitHubClient, chunked
+from issue_index import IssueIndex
+from pastel_issues import CSV_FILE, read_comment_rows, comment_id_from_url, generate_issue_title, build_issue_body
+
+# Configuration
+def get_github_token():
+    """Get GitHub token from environment variable or gh CLI"""
+    token = os.environ.get('GITHUB_TOKEN')
+    if token:
+        return token
+
+    try:
+        result = subprocess.run(
+            ['gh', 'auth', 'token'],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        return result.stdout.strip()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+
+GITHUB_TOKEN = get_github_token()
+REPO_OWNER = 'pixelsock'
+REPO_NAME = 'fuma'
+COPILOT_BOT_ID = 'BOT_kgDOC9w8XQ'
+COPILOT_LOGINS = {'copilot', 'Copilot', 'copilot-swe-agent'}
+POOL_SIZE = 10
+BATCH_SIZE = 50
+COMMENT_WINDOW = 20  # Recent comments fetched with each issue; older ones are paged only when needed
+COMMENT_PAGE_SIZE = 100
+INSTRUCTION_MARKER = 'light purple circle indicator'
+INSTRUCTION_COMMENT = 'The area requiring changes is highlighted with a light purple circle indicator in the screenshot.'
+ISSUE_FIELDS = '''{
+              id
+              number
+              state
+              title
+              body
+              assignees(first: 10) { nodes { login } }
+              comments(last: %d) { pageInfo { hasPreviousPage startCursor } nodes { body } }
+            }''' % COMMENT_WINDOW
+
+def load_desired_state(csv_file=CSV_FILE):
+    """Return {comment_id: desired issue} for every row in the CSV"""
+    desired = {}
+
+    for row in read_comment_rows(csv_file):
+        comment_id = comment_id_from_url(row['Comment URL'])
+        if not comment_id:
+            continue
+
+        desired[comment_id] = {
+            'comment_id': comment_id,
+            'comment_number': row['Comment Number'],
+            'screenshot_url': row['Screenshot URL'],
+            'title': generate_issue_title(row['Comment Text'], row['Original URL']),
+            'body': build_issue_body(
+                row['Comment Text'],
+                row['Screenshot URL'],
+                row['Metadata - Screen Size'],
+                row['Comment URL']
+            )
+        }
+
+    return desired
+
+def match_existing_issues(index, desired):
+    """
+    Map comment IDs to issue numbers from the local index
+    Issues created before the hidden comment marker are matched by their screenshot URL
+    """
+    existing = index.as_dict()
+    by_screenshot = index.screenshots_as_dict()
+
+    for comment_id, want in desired.items():
+        if comment_id not in existing and want['screenshot_url'] in by_screenshot:
+            existing[comment_id] = by_screenshot[want['screenshot_url']]
+
+    return existing
+
+def has_instruction(issue):
+    return any(INSTRUCTION_MARKER in c['body'] for c in issue['comments']['nodes'])
+
+def fetch_older_comments(client, issue):
+    """
+    Page back through an issue's comments older than the fetched window until the
+    instruction marker turns up or the history runs out; prepends to issue['comments']
+    """
+    query = '''
+    query($owner: String!, $name: String!, $number: Int!, $before: String) {
+      repository(owner: $owner, name: $name) {
+        issue(number: $number) {
+          comments(last: %d, before: $before) { pageInfo { hasPreviousPage startCursor } nodes { body } }
+        }
+      }
+    }
+    ''' % COMMENT_PAGE_SIZE
+
+    page_info = issue['comments']['pageInfo']
+    while page_info['hasPreviousPage'] and not has_instruction(issue):
+        variables = {'owner': REPO_OWNER, 'name': REPO_NAME, 'number': issue['number'],
+                     'before': page_info['startCursor']}
+        result = client.graphql(query, variables)
+        comments = result['data']['repository']['issue']['comments']
+        issue['comments']['nodes'] = comments['nodes'] + issue['comments']['nodes']
+        page_info = comments['pageInfo']
+
+def fetch_issue_states(client, issue_numbers, batch_size=BATCH_SIZE):
+    """
+    Fetch title, body, assignees and recent comments for many issues with aliased queries
+    Open issues whose recent comments lack the instruction marker get older comments paged in
+    """
+    issues = {}
+
+    for batch in chunked(sorted(set(issue_numbers)), batch_size):
+        fields = '\n'.join(f'            i{n}: issue(number: {n}) {ISSUE_FIELDS}' for n in batch)
+        query = f'''
+        query($owner: String!, $name: String!) {{
+          repository(owner: $owner, name: $name) {{
+{fields}
+          }}
+        }}
+        '''
+
+        result = client.graphql(query, {'owner': REPO_OWNER, 'name': REPO_NAME})
+        repository = (result.get('data') or {}).get('repository') or {}
+
+        for n in batch:
+            if repository.get(f'i{n}'):
+                issues[n] = repository[f'i{n}']
+
+    for issue in issues.values():
+        if issue['state'] == 'OPEN':
+            fetch_older_comments(client, issue)
+
+    return issues
+
+def compute_plan(desired, existing, current, create_missing=True, update_titles=False):
+    """
+    Compare desired and current state; returns the minimal set of writes
+    {'create': [...], 'update': [...], 'assign': [...], 'comment': [...]}
+    Closed issues are left alone and never re-created; existing titles are only
+    rewritten with update_titles, since they are often edited by hand
+    """
+    plan = {'create': [], 'update': [], 'assign': [], 'comment': []}
+
+    for comment_id, want in sorted(desired.items(), key=lambda item: int(item[1]['comment_number'] or 0)):
+        number = existing.get(comment_id)
+        if number is None:
+            if create_missing:
+                plan['create'].append(want)
+            continue
+
+        issue = current.get(number)
+        if not issue or issue['state'] != 'OPEN':
+            continue
+
+        update = {}
+        if update_titles and issue['title'] != want['title']:
+            update['title'] = want['title']
+        if issue['body'] != want['body']:
+            update['body'] = want['body']
+        if update:
+            plan['update'].append({'issue': issue, **update})
+
+        assignees = {a['login'] for a in issue['assignees']['nodes']}
+        if not assignees & COPILOT_LOGINS:
+            plan['assign'].append(issue)
+
+        if not has_instruction(issue):
+            plan['comment'].append(issue)
+
+    return plan
+
+def plan_size(plan):
+    return sum(len(items) for items in plan.values())
+
+def print_plan(plan):
+    """Print the change plan"""
+    for want in plan['create']:
+        print(f'  + create  comment #{want["comment_number"]}: {want["title"]}')
+    for update in plan['update']:
+        fields = ', '.join(k for k in ('title', 'body') if k in update)
+        print(f'  ~ update  #{update["issue"]["number"]} ({fields})')
+    for issue in plan['assign']:
+        print(f'  ~ assign  #{issue["number"]} to copilot-swe-agent')
+    for issue in plan['comment']:
+        print(f'  + comment #{issue["number"]} instruction comment')
+
+def apply_mutations(client, field, input_type, inputs, labels, failed, selection='{ clientMutationId }',
+                    batch_size=BATCH_SIZE):
+    """
+    Send mutations as aliased batches, printing one line per input; returns results in order
+    A batch whose request fails is reported per input and the remaining batches still run;
+    the labels of failed inputs are appended to failed
+    """
+    results = []
+
+    for batch_inputs, batch_labels in zip(chunked(inputs, batch_size), chunked(labels, batch_size)):
+        try:
+            batch_results = client.aliased_mutation(field, input_type, batch_inputs, selection)
+        except Exception as e:
+            batch_results = [{'alias': None, 'data': None, 'errors': [str(e)]} for _ in batch_inputs]
+
+        for label, result in zip(batch_labels, batch_results):
+            if result['data'] is None:
+                print(f'  ✗ {label}: {result["errors"]}')
+                failed.append(label)
+            else:
+                print(f'  ✓ {label}')
+        results.extend(batch_results)
+
+    return results
+
+def print_failed(failed):
+    """List writes that did not go through; a re-run plans them again"""
+    if failed:
+        print(f'  Failed: {len(failed)} (re-run to retry)')
+        for label in failed:
+            print(f'    ✗ {label}')
+
+def get_repository_id(client):
+    """Get repository GraphQL ID"""
+    query = 'query($owner: String!, $name: String!) { repository(owner: $owner, name: $name) { id } }'
+    result = client.graphql(query, {'owner': REPO_OWNER, 'name': REPO_NAME})
+    return result['data']['repository']['id']
+
+def apply_plan(client, plan, batch_size=BATCH_SIZE):
+    """
+    Apply a change plan with batched mutations
+    Returns {kind: succeeded count} plus 'failed', the labels of writes that did not go through
+    """
+    applied = {'create': 0, 'update': 0, 'assign': 0, 'comment': 0}
+    failed = []
+    comment_ids = [issue['id'] for issue in plan['comment']]
+    comment_labels = [f'Issue #{issue["number"]}: added instruction comment' for issue in plan['comment']]
+
+    if plan['create']:
+        repo_id = get_repository_id(client)
+        results = apply_mutations(
+            client, 'createIssue', 'CreateIssueInput',
+            [
+                {
+                    'repositoryId': repo_id,
+                    'title': want['title'],
+                    'body': want['body'],
+                    'assigneeIds': [COPILOT_BOT_ID]
+                }
+                for want in plan['create']
+            ],
+            [f'Comment #{want["comment_number"]}: created issue' for want in plan['create']],
+            failed,
+            selection='{ issue { id number } }',
+            batch_size=batch_size
+        )
+        for result in results:
+            if result['data'] is not None:
+                applied['create'] += 1
+                issue = result['data']['issue']
+                comment_ids.append(issue['id'])
+                comment_labels.append(f'Issue #{issue["number"]}: added instruction comment')
+
+    if plan['update']:
+        results = apply_mutations(
+            client, 'updateIssue', 'UpdateIssueInput',
+            [
+                {'id': update['issue']['id'], **{k: update[k] for k in ('title', 'body') if k in update}}
+                for update in plan['update']
+            ],
+            [f'Issue #{update["issue"]["number"]}: updated' for update in plan['update']],
+            failed,
+            batch_size=batch_size
+        )
+        applied['update'] = sum(1 for r in results if r['data'] is not None)
+
+    if plan['assign']:
+        results = apply_mutations(
+            client, 'addAssigneesToAssignable', 'AddAssigneesToAssignableInput',
+            [{'assignableId': issue['id'], 'assigneeIds': [COPILOT_BOT_ID]} for issue in plan['assign']],
+            [f'Issue #{issue["number"]}: assigned to copilot-swe-agent' for issue in plan['assign']],
+            failed,
+            batch_size=batch_size
+        )
+        applied['assign'] = sum(1 for r in results if r['data'] is not None)
+
+    if comment_ids:
+        results = apply_mutations(
+            client, 'addComment', 'AddCommentInput',
+            [{'subjectId': issue_id, 'body': INSTRUCTION_COMMENT} for issue_id in comment_ids],
+            comment_labels,
+            failed,
+            batch_size=batch_size
+        )
+        applied['comment'] = sum(1 for r in results if r['data'] is not None)
+
+    applied['failed'] = failed
+    return applied
+
+def reconcile(client, csv_file=CSV_FILE, dry_run=False, create_missing=True, update_titles=False, batch_size=BATCH_SIZE):
+    """Build desired state, fetch current state in bulk, print the plan and apply it unless dry_run"""
+    desired = load_desired_state(csv_file)
+    print(f'Loaded {len(desired)} comments from {csv_file}')
+
+    index = IssueIndex()
+    refreshed = index.refresh(client, REPO_OWNER, REPO_NAME)
+    print(f'  Refreshed {refreshed} issues updated since last run')
+    existing = match_existing_issues(index, desired)
+    index.close()
+
+    current = fetch_issue_states(client, [existing[c] for c in desired if c in existing], batch_size)
+    plan = compute_plan(desired, existing, current, create_missing, update_titles)
+
+    print(f'\nPlan: {len(plan["create"])} to create, {len(plan["update"])} to update, '
+          f'{len(plan["assign"])} to assign, {len(plan["comment"])} to comment')
+    print_plan(plan)
+
+    if dry_run or not plan_size(plan):
+        return plan, None
+
+    print('\nApplying plan...')
+    return plan, apply_plan(client, plan, batch_size)
+
+def main():
+    ap = argparse.ArgumentParser(description='Reconcile GitHub issues with the Pastel comments CSV.')
+    ap.add_argument('--plan', action='store_true', help='Print the change plan without making any writes')
+    ap.add_argument('--csv', default=CSV_FILE, help='Pastel comments CSV (default: %(default)s)')
+    ap.add_argument('--no-create', action='store_true', help='Only update existing issues')
+    ap.add_argument('--titles', action='store_true', help='Also rewrite existing issue titles from the CSV')
+    ap.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Mutations per aliased request (default: %(default)s)')
+    args = ap.parse_args()
+
+    if not GITHUB_TOKEN:
+        print('Error: GitHub authentication not found')
+        print('Please authenticate with: gh auth login')
+        sys.exit(1)
+
+    client = GitHubClient(GITHUB_TOKEN, pool_size=POOL_SIZE)
+    _, applied = reconcile(
+        client,
+        csv_file=args.csv,
+        dry_run=args.plan,
+        create_missing=not args.no_create,
+        update_titles=args.titles,
+        batch_size=args.batch_size
+    )
+
+    print(f'\n═══════════════════════════════════════')
+    if applied is None:
+        print('✓ Nothing applied' + (' (--plan)' if args.plan else ' (already up to date)'))
+    else:
+        print(f'✓ Complete!')
+        print(f'  Created: {applied["create"]}, updated: {applied["update"]}, '
+              f'assigned: {applied["assign"]}, commented: {applied["comment"]}')
+        print_failed(applied['failed'])
+    print(f'  Repository: https://github.com/{REPO_OWNER}/{REPO_NAME}/issues')
+    client.print_timing_summary()
+    client.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Merge Executor - Concurrent PR merging for AutoMergeMonitor
+
+PRs that share no changed files are merged concurrently; PRs the merge planner
+predicts to conflict are merged one by one afterwards. When two merges land on
+the base branch at the same moment GitHub rejects the loser with "Base branch
+was modified"; only those PRs are retried. Branch protection that requires
+up-to-date branches cannot be satisfied by a retry, so those PRs are left for
+the next round (or for GitHub auto-merge, which serializes them server-side).
+
+Throughput is tracked as PRs merged per minute of merge time.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List
+from pr_client import CallResult, PullRequest
+
+MAX_WORKERS = 4
+MAX_ATTEMPTS = 3
+RETRY_DELAY = 1  # Seconds, multiplied by the attempt number
+
+@dataclass
+class MergeOutcome:
+    pr: PullRequest
+    result: CallResult
+    attempts: int = 1
+
+def is_base_modified(result: CallResult) -> bool:
+    """Lost a race with another merge into the same base; retrying is safe"""
+    return result.status in (405, 409) and "base branch was modified" in result.error.lower()
+
+def is_behind(result: CallResult) -> bool:
+    """Branch protection requires the head to be up to date with the base first"""
+    return result.status == 405 and "not up to date" in result.error.lower()
+
+class MergeExecutor:
+    """Runs merges concurrently and retries only PRs that lost a base-branch race"""
+
+    def __init__(self, merge: Callable[[PullRequest], CallResult], max_workers: int = MAX_WORKERS,
+                 max_attempts: int = MAX_ATTEMPTS, log: Callable[..., None] = print):
+        self.merge = merge
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+        self.log = log
+        self.merged = 0
+        self.retries = 0
+        self.merge_time = 0.0
+        self.lock = threading.Lock()
+
+    def merge_one(self, pr: PullRequest) -> MergeOutcome:
+        attempt = 1
+        while True:
+            result = self.merge(pr)
+            if result.ok or not is_base_modified(result) or attempt >= self.max_attempts:
+                return MergeOutcome(pr, result, attempt)
+
+            with self.lock:
+                self.retries += 1
+            self.log(f"↻ PR #{pr.number}: base branch was modified, retrying (attempt {attempt + 1})")
+            time.sleep(RETRY_DELAY * attempt)
+            attempt += 1
+
+    def run(self, independent: List[PullRequest], dependent: List[PullRequest]) -> List[MergeOutcome]:
+        """Merge independent PRs concurrently, then dependent PRs in order"""
+        started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            outcomes = list(pool.map(self.merge_one, independent))
+        outcomes.extend(self.merge_one(pr) for pr in dependent)
+
+        self.merge_time += time.monotonic() - started
+        self.merged += sum(1 for o in outcomes if o.result.ok)
+
+        behind = [o.pr.number for o in outcomes if is_behind(o.result)]
+        if behind:
+            self.log(f"Branch protection requires updated branches for {behind}; left for the next round")
+
+        return outcomes
+
+    def throughput(self) -> float:
+        """PRs merged per minute of merge time"""
+        return self.merged / (self.merge_time / 60) if self.merge_time > 0 else 0.0
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Merge Planner - Conflict-aware merge ordering for AutoMergeMonitor
+
+Every merge can turn other PRs that touch the same files into CONFLICTING,
+and each of those costs a Copilot conflict-resolution round. The planner
+builds an overlap graph from the PRs' changed-file sets and orders merges so
+as many PRs as possible land before any conflict:
+
+1. PRs that share no file with any other candidate go first
+2. From each cluster of overlapping PRs, a greedy independent set is merged
+   next, lowest overlap first, so PRs on hot files do not block the rest
+3. The remaining PRs go last; each overlaps an earlier merge and is
+   predicted to conflict
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Set
+
+HOT_FILE_THRESHOLD = 3  # A file touched by this many candidate PRs is reported as hot
+
+@dataclass
+class MergePlan:
+    order: List[int]
+    predicted_conflicts: Set[int]  # PRs that overlap a PR merged before them
+    clusters: List[List[int]] = field(default_factory=list)  # Groups of PRs linked by shared files
+    hot_files: Dict[str, int] = field(default_factory=dict)  # Path -> number of PRs touching it
+
+def overlap_graph(files: Dict[int, Set[str]]) -> Dict[int, Set[int]]:
+    """Map each PR to the PRs it shares at least one changed file with"""
+    by_path: Dict[str, Set[int]] = {}
+    for number, paths in files.items():
+        for path in paths:
+            by_path.setdefault(path, set()).add(number)
+
+    graph: Dict[int, Set[int]] = {number: set() for number in files}
+    for numbers in by_path.values():
+        for number in numbers:
+            graph[number].update(numbers - {number})
+    return graph
+
+def connected_clusters(graph: Dict[int, Set[int]]) -> List[List[int]]:
+    """Connected components of the overlap graph with more than one PR"""
+    seen: Set[int] = set()
+    clusters = []
+    for start in sorted(graph):
+        if start in seen or not graph[start]:
+            continue
+        stack, component = [start], []
+        seen.add(start)
+        while stack:
+            number = stack.pop()
+            component.append(number)
+            for neighbour in graph[number] - seen:
+                seen.add(neighbour)
+                stack.append(neighbour)
+        clusters.append(sorted(component))
+    return clusters
+
+def plan_merges(files: Dict[int, Set[str]]) -> MergePlan:
+    """Order PRs to maximise merges before the first predicted conflict"""
+    graph = overlap_graph(files)
+
+    path_counts: Dict[str, int] = {}
+    for paths in files.values():
+        for path in paths:
+            path_counts[path] = path_counts.get(path, 0) + 1
+    hot_files = {path: count for path, count in path_counts.items() if count >= HOT_FILE_THRESHOLD}
+
+    # Lowest-degree-first greedy independent set; disjoint PRs have degree 0 and come first
+    by_degree = sorted(graph, key=lambda n: (len(graph[n]), n))
+    independent: List[int] = []
+    blocked: Set[int] = set()
+    for number in by_degree:
+        if number in blocked:
+            continue
+        independent.append(number)
+        blocked.update(graph[number])
+
+    deferred = [n for n in by_degree if n not in independent]
+    order = independent + deferred
+
+    return MergePlan(
+        order=order,
+        predicted_conflicts=set(deferred),
+        clusters=connected_clusters(graph),
+        hot_files=dict(sorted(hot_files.items(), key=lambda item: -item[1]))
+    )
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Pastel comment -> GitHub issue content
+Title, body and CSV helpers shared by the issue creation scripts and the reconciler, so
+an issue created by one is already in the state the other wants and is not rewritten
+"""
+
+import csv
+import re
+from urllib.parse import urlparse
+
+CSV_FILE = 'pastel-comments.csv'
+
+def read_comment_rows(csv_file=CSV_FILE):
+    """All rows of a Pastel comments CSV export"""
+    with open(csv_file, 'r', encoding='utf-8-sig') as f:
+        return list(csv.DictReader(f))
+
+def comment_id_from_url(comment_url):
+    """Pastel comment ID from a .../comment/<id>/ URL, or None"""
+    match = re.search(r'/comment/(\d+)/', comment_url or '')
+    return match.group(1) if match else None
+
+def extract_page_context(page_url):
+    """Extract readable page context from URL"""
+    path = urlparse(page_url).path
+    parts = [p for p in path.split('/') if p and p != 'articles']
+
+    if not parts:
+        return 'Home Page', 'home'
+
+    page_slug = parts[-1]
+    page_name = page_slug.replace('-', ' ').title()
+
+    return page_name, page_slug
+
+def generate_issue_title(comment_text, page_url):
+    """Generate a descriptive title for the GitHub issue"""
+    page_name, _ = extract_page_context(page_url)
+
+    # Create a concise title from the comment
+    lines = comment_text.strip().split('\n')
+    title_text = lines[0]
+
+    # Truncate if too long
+    if len(title_text) > 50:
+        title_text = title_text[:47] + '...'
+
+    # Clean up quotes and special chars
+    title_text = title_text.replace('"', '').replace("'", '')
+
+    return f'{page_name}: {title_text}'
+
+def build_issue_body(comment_text, screenshot_url, screen_size, comment_url=None):
+    """
+    Build issue body with the screenshot embedded
+    The Pastel comment URL goes in a hidden HTML comment so the issue index can find it again
+    """
+
+    # Parse screen size
+    width, height = '1605', '851'
+    if screen_size and 'x' in screen_size:
+        try:
+            w, h = screen_size.split(' x ')
+            width, height = w.strip(), h.strip()
+        except:
+            pass
+
+    new_body = f'{comment_text}\n\n'
+    new_body += f'<img width="{width}" height="{height}" alt="Image" src="{screenshot_url}" />'
+    if comment_url:
+        new_body += f'\n\n<!-- Pastel comment: {comment_url} -->'
+    return new_body
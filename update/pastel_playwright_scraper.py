@@ -1,13 +1,42 @@
 import argparse
+import asyncio
+import base64
+import json
+import mimetypes
 import os
 import io
+import re
 import time
-from playwright.sync_api import sync_playwright
+from urllib.parse import urlparse
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 from PIL import Image
 from openpyxl import Workbook
 from openpyxl.drawing.image import Image as XLImage
 from openpyxl.utils import get_column_letter
 
+# Upper bounds (seconds) for waits that normally end on a page signal much sooner
+LOAD_TIMEOUT = 15
+IDLE_TIMEOUT = 5
+EXPAND_TIMEOUT = 5
+
+# Boards scraped at once, each in its own browser context of the one Chromium instance
+MAX_CONTEXTS = 3
+# Screenshot downloads in flight per board
+MAX_DOWNLOADS = 8
+
+async def timed_wait(wait, timeout):
+    """
+    Run a Playwright wait bounded by timeout seconds
+    Returns (seconds actually waited, whether the signal arrived before the bound)
+    """
+    started = time.perf_counter()
+    try:
+        await wait(timeout * 1000)
+        arrived = True
+    except PlaywrightTimeoutError:
+        arrived = False
+    return time.perf_counter() - started, arrived
+
 def normalize_png(data):
     im = Image.open(io.BytesIO(data)).convert('RGBA')
     out = io.BytesIO()
@@ -25,150 +54,496 @@ def fit_image(ws, xlimg, row, col, max_w_px=480, max_h_px=320, min_row_h_px=110)
     ws.add_image(xlimg, f'{get_column_letter(col)}{row}')
     ws.row_dimensions[row].height = max(ws.row_dimensions[row].height or 15, min_row_h_px * 0.75)
 
-def extract_comments_with_playwright(url):
-    comments = []
-
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-
-        print(f'Navigating to {url}...')
-        page.goto(url)
+# Only JSON from Pastel's comment endpoints is read: a usepastel.com host and a path segment
+# naming comments, the same scheme as the board's /link/<board>/comment/<id>/ permalinks.
+# Everything else the canvas loads (analytics, chat widgets, the reviewed site's own XHRs)
+# is ignored. Override with --api-pattern after checking a --save-har capture
+PASTEL_API_PATTERN = r'^https://(?:[\w-]+\.)*usepastel\.com/[^?#]*/comments?(?:[/?#]|$)'
+
+# Keys Pastel uses (or plausibly uses) for each comment field in its JSON payloads
+ID_KEYS = ('id', 'commentId', 'comment_id', 'number', 'commentNumber')
+TEXT_KEYS = ('text', 'body', 'content', 'comment', 'message')
+AUTHOR_KEYS = ('author', 'user', 'createdBy', 'created_by', 'userName', 'user_name', 'authorName')
+DATE_KEYS = ('createdAt', 'created_at', 'dateCreated', 'date_created', 'created', 'date')
+PAGE_URL_KEYS = ('originalUrl', 'original_url', 'pageUrl', 'page_url', 'url')
+PAGE_TITLE_KEYS = ('pageTitle', 'page_title', 'title')
+SCREENSHOT_KEYS = ('screenshotUrl', 'screenshot_url', 'screenshot', 'imageUrl', 'image_url')
+
+def first_value(obj, keys):
+    for key in keys:
+        value = obj.get(key)
+        if value not in (None, ''):
+            return value
+    return None
+
+def author_name(value):
+    if isinstance(value, dict):
+        return first_value(value, ('name', 'fullName', 'full_name', 'displayName', 'username', 'email')) or ''
+    return value if isinstance(value, str) else ''
+
+def looks_like_comment(obj):
+    """A dict with a numeric id (Pastel comment ids are integers), a text body and an author or creation date"""
+    text = first_value(obj, TEXT_KEYS)
+    return (
+        isinstance(text, str)
+        and str(first_value(obj, ID_KEYS)).isdigit()
+        and (first_value(obj, AUTHOR_KEYS) is not None or first_value(obj, DATE_KEYS) is not None)
+    )
+
+def iter_comment_objects(payload):
+    """Walk a JSON payload and yield every object that looks like a comment"""
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if looks_like_comment(node):
+                # Replies nested inside a comment stay part of that comment
+                yield node
+                continue
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
 
-        # Wait for comments to load
-        print('Waiting for comments to load...')
-        page.wait_for_timeout(3000)
+def comments_from_payloads(payloads, board_url):
+    """Build comment records from captured JSON payloads, deduplicated by comment id"""
+    comments = []
+    seen = set()
 
-        # Find all comment buttons in the sidebar
-        comment_buttons = page.locator('button[class*="comment"]').all()
-        total_comments = len(comment_buttons)
-        print(f'Found {total_comments} comments')
+    for payload in payloads:
+        for obj in iter_comment_objects(payload):
+            comment_id = str(first_value(obj, ID_KEYS))
+            if comment_id in seen:
+                continue
+            seen.add(comment_id)
+
+            screenshot = first_value(obj, SCREENSHOT_KEYS)
+            if isinstance(screenshot, dict):
+                screenshot = first_value(screenshot, ('url', 'src'))
+
+            comments.append({
+                'id': f'c{comment_id}',
+                'author': author_name(first_value(obj, AUTHOR_KEYS)).strip() or 'Unknown',
+                'date': str(first_value(obj, DATE_KEYS) or '').strip(),
+                'page_title': str(first_value(obj, PAGE_TITLE_KEYS) or ''),
+                'page_url': str(first_value(obj, PAGE_URL_KEYS) or board_url),
+                'text': first_value(obj, TEXT_KEYS).strip(),
+                'screenshot_url': screenshot if isinstance(screenshot, str) else None,
+                'screenshot_path': None
+            })
 
-        # Alternative: try finding by the pattern we see in the snapshot
-        if total_comments == 0:
-            # Look for buttons that contain author name and date pattern
-            comment_buttons = page.locator('button:has-text("Andrew Ausel")').all()
-            total_comments = len(comment_buttons)
-            print(f'Found {total_comments} comments using alternative selector')
+    return comments
 
-        for idx in range(total_comments):
+def load_har_payloads(har_path, api_pattern):
+    """JSON response bodies of Pastel comment endpoints from a saved HAR file, in capture order"""
+    with open(har_path, 'r', encoding='utf-8') as f:
+        har = json.load(f)
+
+    payloads = []
+    for entry in har['log']['entries']:
+        if not api_pattern.search(entry['request']['url']):
+            continue
+        content = entry['response'].get('content', {})
+        if 'json' not in content.get('mimeType', '') or not content.get('text'):
+            continue
+        text = content['text']
+        if content.get('encoding') == 'base64':
+            text = base64.b64decode(text).decode('utf-8')
+        try:
+            payloads.append(json.loads(text))
+        except ValueError:
+            continue
+    return payloads
+
+def board_slug(url):
+    """Short board name for the workbook and file names: the last segment of the share URL"""
+    segments = [part for part in urlparse(url).path.split('/') if part]
+    return segments[-1] if segments else urlparse(url).netloc
+
+async def download_screenshots(request, comments, board):
+    """
+    Fetch the original screenshot assets through the browser context's request API
+    Each URL is downloaded once, in parallel, and shared by every comment that uses it
+    """
+    by_url = {}
+    for c in comments:
+        if c['screenshot_url']:
+            by_url.setdefault(c['screenshot_url'], []).append(c)
+
+    semaphore = asyncio.Semaphore(MAX_DOWNLOADS)
+
+    async def fetch(url, owners):
+        async with semaphore:
             try:
-                # Re-query comment buttons each time to avoid stale references
-                comment_buttons = page.locator('button:has-text("Andrew Ausel")').all()
-                if idx >= len(comment_buttons):
-                    break
-
-                button = comment_buttons[idx]
-
-                # Get comment preview text
-                button_text = button.inner_text()
-                print(f'Processing comment {idx + 1}/{total_comments}: {button_text[:50]}...')
-
-                # Click the comment to expand/view it
-                button.click()
-                page.wait_for_timeout(1000)  # Wait for comment to expand
-
-                # Extract comment details from the expanded view
-                # Look for the comment content area
-                comment_content = ''
-                author = 'Unknown'
-                date = ''
-                page_url = url
-
-                # Try to extract from the button itself
-                lines = button_text.split('\n')
-                if len(lines) >= 2:
-                    # First line usually has author and date
-                    first_line = lines[0]
-                    if 'Oct' in first_line or 'Sep' in first_line or 'Nov' in first_line:
-                        parts = first_line.rsplit(' ', 2)  # Split from right to get date
-                        if len(parts) >= 3:
-                            author = parts[0]
-                            date = ' '.join(parts[1:])
-                    else:
-                        author = first_line
-
-                    # Rest is the comment
-                    comment_content = '\n'.join(lines[1:])
-
-                # Try to get page context from nearby elements
-                page_title = ''
-                try:
-                    # Look for page path in the parent container
-                    parent = button.locator('xpath=ancestor::*[contains(@class, "comment-group")]').first
-                    if parent:
-                        path_elem = parent.locator('text=/\\/articles\\//').first
-                        if path_elem:
-                            page_title = path_elem.inner_text()
-                except:
-                    pass
-
-                # Try to capture screenshot if there's an image
-                screenshot_path = None
-                try:
-                    # Look for image in the comment area
-                    img = page.locator('img[src*="pastel"]').first
-                    if img:
-                        screenshot_path = f'pastel_screenshots/comment_{idx + 1}.png'
-                        img.screenshot(path=screenshot_path)
-                except:
-                    pass
-
-                comments.append({
-                    'id': f'c{idx + 1}',
-                    'author': author.strip(),
-                    'date': date.strip(),
-                    'page_title': page_title,
-                    'page_url': page_url,
-                    'text': comment_content.strip(),
-                    'screenshot_path': screenshot_path
-                })
-
+                response = await request.get(url)
+                if not response.ok:
+                    print(f'[{board}] Screenshot for {owners[0]["id"]} returned HTTP {response.status}')
+                    return 0
+                body = await response.body()
             except Exception as e:
-                print(f'Error processing comment {idx + 1}: {e}')
-                continue
-
-        browser.close()
+                print(f'[{board}] Error downloading screenshot for {owners[0]["id"]}: {e}')
+                return 0
+
+        content_type = response.headers.get('content-type', '').split(';')[0]
+        ext = mimetypes.guess_extension(content_type) or '.png'
+        path = os.path.join('pastel_screenshots', f"{board}-{owners[0]['id']}{ext}")
+        with open(path, 'wb') as f:
+            f.write(body)
+        for c in owners:
+            c['screenshot_path'] = path
+        return len(body)
+
+    started = time.perf_counter()
+    sizes = await asyncio.gather(*(fetch(url, owners) for url, owners in by_url.items()))
+    if by_url:
+        print(f'[{board}] Downloaded {sum(1 for n in sizes if n)}/{len(by_url)} screenshots '
+              f'({sum(sizes) / 1024:.0f} KiB) for {sum(len(o) for o in by_url.values())} comments '
+              f'in {time.perf_counter() - started:.1f}s')
+
+async def capture_comments_from_network(context, url, board, api_pattern, load_timeout=LOAD_TIMEOUT):
+    """
+    Load the board once and build comments from the JSON the Pastel canvas fetches from
+    its comment endpoints
+    No sidebar clicks and no per-comment waits; a context created with record_har_path
+    saves the traffic as a fixture
+    """
+    responses = []
+
+    def on_response(response):
+        if response.request.resource_type not in ('xhr', 'fetch'):
+            return
+        if not api_pattern.search(response.url):
+            return
+        if 'json' not in response.headers.get('content-type', ''):
+            return
+        responses.append(response)
+
+    page = await context.new_page()
+    page.on('response', on_response)
+
+    print(f'[{board}] Navigating to {url}...')
+    started = time.perf_counter()
+    await page.goto(url, wait_until='domcontentloaded')
+    _, idle = await timed_wait(lambda ms: page.wait_for_load_state('networkidle', timeout=ms), load_timeout)
+
+    # Bodies are read after the page settles, in the order the responses arrived
+    bodies = await asyncio.gather(*(r.json() for r in responses), return_exceptions=True)
+    payloads = [body for body in bodies if not isinstance(body, Exception)]
+    print(f'[{board}] Captured {len(payloads)} comment API responses in {time.perf_counter() - started:.1f}s'
+          + ('' if idle else f' (network still busy after {load_timeout}s)'))
+
+    await page.close()
+    return comments_from_payloads(payloads, url)
+
+# Tried in order; the first selector that matches any node is used. The sidebar button
+# class is what the click-through scraper matched on the live board; comment permalinks
+# are the structural fallback if Pastel renames its classes
+COMMENT_SELECTORS = ('button[class*="comment"]', 'a[href*="/comment/"]')
+
+# Pastel opens a clicked comment in a detail panel outside the sidebar; the panel is
+# recognised by the screenshot image the click-through scraper read from the expanded view.
+# Before each click the panel's current images are tagged with their src so the next
+# render, even one that reuses the <img> element, is detectable
+MARK_PANEL_JS = """
+() => document.querySelectorAll('img[src*="pastel"]').forEach((img) => {
+  if (!img.closest('[data-scraper-id]')) img.setAttribute('data-scraper-seen', img.src);
+})
+"""
+
+# True once the clicked node's text differs from its preview or the detail panel shows
+# an image it did not show before the click
+EXPANDED_JS = """
+([idx, before]) => {
+  const node = document.querySelector(`[data-scraper-id="${idx}"]`);
+  if (node && node.innerText !== before) return true;
+  return [...document.querySelectorAll('img[src*="pastel"]')].some((img) =>
+    !img.closest('[data-scraper-id]') && img.getAttribute('data-scraper-seen') !== img.src);
+}
+"""
+
+# Runs once in the page: tags every comment node with a stable data-scraper-id and
+# returns everything needed to build its record, so no locator is re-run per comment
+SNAPSHOT_JS = """
+(nodes) => nodes.map((node, index) => {
+  node.setAttribute('data-scraper-id', String(index));
+  const link = node.querySelector('a[href*="/comment/"]') || node.closest('a[href*="/comment/"]');
+  const match = link && link.href.match(/\\/comment\\/(\\d+)/);
+  const group = node.closest('[class*="comment-group"]');
+  const img = node.querySelector('img[src*="pastel"]');
+  return {
+    index,
+    key: node.dataset.commentId || node.dataset.id || (match && match[1]) || node.id || null,
+    text: node.innerText,
+    group: group ? group.innerText : '',
+    screenshot: img ? img.src : null
+  };
+})
+"""
+
+MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+def parse_comment_text(text):
+    """Split a comment node's text into author, date and body"""
+    author, date, body = 'Unknown', '', ''
+    lines = text.split('\n')
+    if len(lines) >= 2:
+        # First line usually has author and date
+        first_line = lines[0]
+        if any(month in first_line for month in MONTHS):
+            parts = first_line.rsplit(' ', 2)  # Split from right to get date
+            if len(parts) >= 3:
+                author = parts[0]
+                date = ' '.join(parts[1:])
+        else:
+            author = first_line
+
+        # Rest is the comment
+        body = '\n'.join(lines[1:])
+    return author.strip(), date.strip(), body.strip()
+
+# The detail panel after an expand, found by its screenshot: an image rendered since the
+# click, or one whose panel links to this comment (consecutive comments on one screenshot).
+# An image that was already on screen is never taken on its own, since it may belong to the
+# last comment. Returns the panel's text and screenshot, both null when no panel is found
+PANEL_JS = """
+(key) => {
+  const imgs = [...document.querySelectorAll('img[src*="pastel"]')].filter((img) => !img.closest('[data-scraper-id]'));
+  const panelOf = (img) => {
+    let panel = img;
+    while (panel.parentElement && !panel.parentElement.querySelector('[data-scraper-id]')) panel = panel.parentElement;
+    return panel;
+  };
+  const tied = (img) => !!key && !!panelOf(img).querySelector(
+    `a[href*="/comment/${key}/"], [data-comment-id="${key}"]`);
+  const img = imgs.find((img) => img.getAttribute('data-scraper-seen') !== img.src) || imgs.find(tied);
+  return img ? {text: panelOf(img).innerText, screenshot: img.src} : {text: null, screenshot: null};
+}
+"""
+
+def is_comment_response(url, key):
+    """A usepastel.com response whose path has the comment id as a whole segment"""
+    parsed = urlparse(url)
+    host = parsed.hostname or ''
+    return (host == 'usepastel.com' or host.endswith('.usepastel.com')) and key in parsed.path.split('/')
+
+def panel_body(panel_text, preview):
+    """The full comment from the detail panel, without the author/date line the preview also shows"""
+    lines = panel_text.strip().split('\n')
+    if lines and lines[0].strip() == preview.split('\n')[0].strip():
+        lines = lines[1:]
+    return '\n'.join(lines).strip()
+
+async def expand_comment(page, node, idx, text, key, timeout):
+    """
+    Click a comment and wait, bounded by timeout seconds, for the first sign it opened:
+    its own text changes, the detail panel renders it, or its detail request completes
+    Returns (seconds actually waited, whether any signal arrived before the bound)
+    """
+    await page.evaluate(MARK_PANEL_JS)
+    ms = timeout * 1000
+    waits = [page.wait_for_function(EXPANDED_JS, arg=[idx, text], timeout=ms)]
+    if key:
+        waits.append(page.wait_for_event('response', predicate=lambda r: is_comment_response(r.url, key), timeout=ms))
+
+    # Armed before the click so a fast response is not missed
+    tasks = [asyncio.ensure_future(wait) for wait in waits]
+    started = time.perf_counter()
+    try:
+        await node.click()
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        arrived = any(task.exception() is None for task in done)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return time.perf_counter() - started, arrived
+
+def needs_expand(text):
+    """Only truncated previews need a click to reveal the full comment"""
+    text = text.rstrip()
+    return len(text.split('\n')) < 2 or text.endswith(('…', '...'))
+
+async def extract_comments_with_playwright(context, url, board, load_timeout=LOAD_TIMEOUT,
+                                          expand_timeout=EXPAND_TIMEOUT):
+    comments = []
+    page = await context.new_page()
+
+    print(f'[{board}] Navigating to {url}...')
+    await page.goto(url, wait_until='domcontentloaded')
+
+    # Wait for the first comment node, then for the sidebar's data requests to settle
+    print(f'[{board}] Waiting for comments to load...')
+    any_comment = ', '.join(COMMENT_SELECTORS)
+    waited, found = await timed_wait(lambda ms: page.wait_for_selector(any_comment, timeout=ms), load_timeout)
+    idle_wait, _ = await timed_wait(lambda ms: page.wait_for_load_state('networkidle', timeout=ms), IDLE_TIMEOUT)
+    print(f'[{board}] Comments rendered after {waited:.1f}s, network idle after another {idle_wait:.1f}s'
+          + ('' if found else f' (no comment node within {load_timeout}s)'))
+
+    # One pass over the DOM for every comment node
+    snapshot = []
+    for selector in COMMENT_SELECTORS:
+        snapshot = await page.eval_on_selector_all(selector, SNAPSHOT_JS)
+        if snapshot:
+            print(f'[{board}] Found {len(snapshot)} comments with {selector}')
+            break
+
+    total_comments = len(snapshot)
+    clicks = 0
+    waits = []
+
+    for item in snapshot:
+        idx = item['index']
+        try:
+            text = item['text']
+            print(f'[{board}] Processing comment {idx + 1}/{total_comments}: {text[:50]}...')
+
+            # The full-size screenshot is only in the detail panel, so a comment is opened
+            # unless its sidebar entry already carries one
+            screenshot = item['screenshot']
+            panel_text = None
+            if needs_expand(text) or not screenshot:
+                # Click the comment to expand/view it, addressing it by its tag, then wait for
+                # it to open and for any fetch the click started
+                node = page.locator(f'[data-scraper-id="{idx}"]')
+                waited, expanded = await expand_comment(page, node, idx, text, item['key'], expand_timeout)
+                clicks += 1
+                settle, _ = await timed_wait(
+                    lambda ms: page.wait_for_load_state('networkidle', timeout=ms), expand_timeout)
+                waits.append(waited + settle)
+                print(f'[{board}]   expanded in {(waited + settle) * 1000:.0f}ms'
+                      + ('' if expanded else f' (no expand signal after {expand_timeout}s)'))
+                text = await node.inner_text()
+                panel = await page.evaluate(PANEL_JS, item['key'])
+                panel_text = panel['text']
+                screenshot = panel['screenshot'] or screenshot
+
+            author, date, comment_content = parse_comment_text(text)
+            # A preview the click did not expand in place: the full body is in the detail panel
+            if panel_text and needs_expand(text):
+                comment_content = panel_body(panel_text, text)
+
+            # Page path from the surrounding comment group
+            page_title = next((line.strip() for line in item['group'].split('\n')
+                               if line.strip().startswith('/')), '')
+
+            comments.append({
+                'id': f"c{item['key'] or idx + 1}",
+                'author': author,
+                'date': date,
+                'page_title': page_title,
+                'page_url': url,
+                'text': comment_content,
+                'screenshot_url': screenshot,
+                'screenshot_path': None
+            })
+
+        except Exception as e:
+            print(f'[{board}] Error processing comment {idx + 1}: {e}')
+            continue
+
+    print(f'[{board}] Expanded {clicks} of {total_comments} comments by clicking')
+    if waits:
+        print(f'[{board}] Expand wait: avg {sum(waits) / len(waits) * 1000:.0f}ms, max {max(waits) * 1000:.0f}ms, '
+              f'total {sum(waits):.1f}s')
+    await page.close()
 
     return comments
 
-def main():
-    ap = argparse.ArgumentParser(description='Export Pastel comments using Playwright automation.')
-    ap.add_argument('url', help='Public Pastel share URL')
-    ap.add_argument('--out', default='pastel_comments_playwright.xlsx', help='Output Excel filename')
-    args = ap.parse_args()
-
-    os.makedirs('pastel_screenshots', exist_ok=True)
+def har_path_for(save_har, index, total):
+    """One HAR per board: board.har, or board-1.har, board-2.har, ... for several boards"""
+    if not save_har or total == 1:
+        return save_har
+    root, ext = os.path.splitext(save_har)
+    return f'{root}-{index + 1}{ext}'
+
+async def scrape_board(browser, url, index, total, semaphore, args):
+    """Scrape one board in its own browser context; at most MAX_CONTEXTS run at once"""
+    board = board_slug(url)
+    async with semaphore:
+        har = har_path_for(args.save_har, index, total)
+        context = await (browser.new_context(record_har_path=har) if har else browser.new_context())
+        try:
+            started = time.perf_counter()
+            comments = []
+            if args.mode == 'network':
+                comments = await capture_comments_from_network(
+                    context, url, board, args.api_pattern, args.load_timeout)
+                if not comments:
+                    print(f'[{board}] No comments in captured responses, falling back to DOM scraping')
+            if not comments:
+                comments = await extract_comments_with_playwright(
+                    context, url, board, args.load_timeout, args.expand_timeout)
+            await download_screenshots(context.request, comments, board)
+            print(f'[{board}] ✓ {len(comments)} comments in {time.perf_counter() - started:.1f}s')
+        except Exception as e:
+            print(f'[{board}] ✗ Failed: {e}')
+            comments = []
+        finally:
+            await context.close()
+
+    for c in comments:
+        c['board'] = board
+    return comments
 
-    comments = extract_comments_with_playwright(args.url)
+async def scrape_boards(urls, args):
+    """Launch Chromium once and scrape every board across a bounded pool of contexts"""
+    semaphore = asyncio.Semaphore(args.contexts)
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            results = await asyncio.gather(*(scrape_board(browser, url, i, len(urls), semaphore, args)
+                                             for i, url in enumerate(urls)))
+        finally:
+            await browser.close()
+    return [c for board_comments in results for c in board_comments]
+
+async def scrape_har(har_path, url, api_pattern):
+    """Build one board's comments from a saved HAR and download their screenshots"""
+    board = board_slug(url)
+    comments = comments_from_payloads(load_har_payloads(har_path, api_pattern), url)
+    print(f'[{board}] {len(comments)} comments in {har_path}')
+
+    async with async_playwright() as p:
+        request = await p.request.new_context()
+        try:
+            await download_screenshots(request, comments, board)
+        finally:
+            await request.dispose()
+
+    for c in comments:
+        c['board'] = board
+    return comments
 
-    if not comments:
-        print('No comments found.')
-        return
+def read_urls_file(path):
+    """Share URLs one per line; blank lines and # comments are skipped"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
 
+def write_workbook(comments, out):
     wb = Workbook()
     ws = wb.active
     ws.title = 'Pastel Comments'
 
-    headers = ['ID', 'Author', 'Date', 'Page Title', 'Page URL', 'Comment', 'Screenshot']
+    headers = ['ID', 'Board', 'Author', 'Date', 'Page Title', 'Page URL', 'Comment', 'Screenshot']
     ws.append(headers)
 
     # column widths
     set_col_width(ws, 1, 10)
-    set_col_width(ws, 2, 20)
-    set_col_width(ws, 3, 18)
-    set_col_width(ws, 4, 42)
-    set_col_width(ws, 5, 45)
-    set_col_width(ws, 6, 90)
-    set_col_width(ws, 7, 62)
+    set_col_width(ws, 2, 14)
+    set_col_width(ws, 3, 20)
+    set_col_width(ws, 4, 18)
+    set_col_width(ws, 5, 42)
+    set_col_width(ws, 6, 45)
+    set_col_width(ws, 7, 90)
+    set_col_width(ws, 8, 62)
 
     for r, c in enumerate(comments, start=2):
         ws.cell(row=r, column=1, value=c['id'])
-        ws.cell(row=r, column=2, value=c['author'])
-        ws.cell(row=r, column=3, value=c['date'])
-        ws.cell(row=r, column=4, value=c['page_title'])
-        ws.cell(row=r, column=5, value=c['page_url'])
-        ws.cell(row=r, column=6, value=c['text'])
+        ws.cell(row=r, column=2, value=c.get('board', ''))
+        ws.cell(row=r, column=3, value=c['author'])
+        ws.cell(row=r, column=4, value=c['date'])
+        ws.cell(row=r, column=5, value=c['page_title'])
+        ws.cell(row=r, column=6, value=c['page_url'])
+        ws.cell(row=r, column=7, value=c['text'])
 
         if c['screenshot_path'] and os.path.exists(c['screenshot_path']):
             try:
@@ -176,12 +551,58 @@ def main():
                     img_bytes = f.read()
                 png, w, h = normalize_png(img_bytes)
                 xlimg = XLImage(io.BytesIO(png))
-                fit_image(ws, xlimg, row=r, col=7, max_w_px=480, max_h_px=320, min_row_h_px=max(120, min(360, h)))
+                fit_image(ws, xlimg, row=r, col=8, max_w_px=480, max_h_px=320, min_row_h_px=max(120, min(360, h)))
             except Exception as e:
-                ws.cell(row=r, column=7, value=f'(screenshot error: {e})')
+                ws.cell(row=r, column=8, value=f'(screenshot error: {e})')
+
+    wb.save(out)
+    print(f'Done: {out} with {len(comments)} comments. Images in ./pastel_screenshots/')
+
+def main():
+    ap = argparse.ArgumentParser(description='Export Pastel comments using Playwright automation.')
+    ap.add_argument('urls', nargs='*', help='Public Pastel share URLs')
+    ap.add_argument('--urls-file', help='File with one share URL per line (# comments allowed)')
+    ap.add_argument('--out', default='pastel_comments_playwright.xlsx', help='Output Excel filename')
+    ap.add_argument('--mode', choices=('network', 'dom'), default='dom',
+                    help='dom: click through the sidebar; network: build comments from captured comment API '
+                         'responses (fast, falls back to dom when none are captured)')
+    ap.add_argument('--api-pattern', type=re.compile, default=PASTEL_API_PATTERN,
+                    help='Regex for the Pastel comment API URLs read in network and --har modes')
+    ap.add_argument('--contexts', type=int, default=MAX_CONTEXTS,
+                    help=f'Boards scraped at once, one browser context each (default: {MAX_CONTEXTS})')
+    ap.add_argument('--har', help='Build comments from a saved HAR file instead of loading the board (one URL)')
+    ap.add_argument('--save-har', help='Record board traffic to this HAR file; numbered per board for several URLs')
+    ap.add_argument('--load-timeout', type=float, default=LOAD_TIMEOUT,
+                    help=f'Max seconds to wait for the board to load (default: {LOAD_TIMEOUT})')
+    ap.add_argument('--expand-timeout', type=float, default=EXPAND_TIMEOUT,
+                    help=f'Max seconds to wait for a clicked comment to expand (default: {EXPAND_TIMEOUT})')
+    args = ap.parse_args()
+
+    urls = list(args.urls)
+    if args.urls_file:
+        urls += read_urls_file(args.urls_file)
+    # Keep the given order, drop repeats
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        ap.error('at least one share URL is required (positional or --urls-file)')
+    if args.har and len(urls) != 1:
+        ap.error('--har builds a single board; pass exactly one URL')
+
+    os.makedirs('pastel_screenshots', exist_ok=True)
+
+    if args.har:
+        comments = asyncio.run(scrape_har(args.har, urls[0], args.api_pattern))
+    else:
+        started = time.perf_counter()
+        comments = asyncio.run(scrape_boards(urls, args))
+        print(f'Scraped {len(urls)} boards in {time.perf_counter() - started:.1f}s '
+              f'with up to {args.contexts} contexts')
+
+    if not comments:
+        print('No comments found.')
+        return
 
-    wb.save(args.out)
-    print(f'Done: {args.out} with {len(comments)} comments. Images in ./pastel_screenshots/')
+    write_workbook(comments, args.out)
 
 if __name__ == '__main__':
     main()
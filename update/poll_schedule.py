@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Per-PR adaptive poll schedules
+
+Each PR gets its own poll interval instead of a flat CHECK_INTERVAL:
+- right after a Copilot trigger or while CI is pending, poll fast
+- while a PR's observed state does not change, back off exponentially
+- UNKNOWN mergeable state is computed lazily by GitHub, so re-check it quickly
+"""
+
+import time
+from typing import Dict, Hashable, List, Optional
+
+FAST_INTERVAL = 10  # After a trigger or while CI is pending
+UNKNOWN_INTERVAL = 5  # GitHub usually resolves UNKNOWN mergeability within seconds
+BASE_INTERVAL = 30
+MAX_INTERVAL = 600  # Only while webhooks report changes; polling is then just a fallback
+POLLING_MAX_INTERVAL = 60  # Polling alone never backs off past the old flat CHECK_INTERVAL
+BACKOFF_FACTOR = 2
+COALESCE_WINDOW = 5  # PRs due this soon ride along with the current poll
+
+class PollSchedule:
+    """Next-poll times per PR with exponential backoff while nothing changes"""
+
+    def __init__(self, base: float = BASE_INTERVAL, max_interval: float = MAX_INTERVAL,
+                 factor: float = BACKOFF_FACTOR):
+        self.base = base
+        self.max_interval = max_interval
+        self.factor = factor
+        self.intervals: Dict[int, float] = {}
+        self.next_poll: Dict[int, float] = {}
+        self.fingerprints: Dict[int, Hashable] = {}
+        self.polls = 0
+        self.started = time.monotonic()
+
+    def _set(self, pr_number: int, interval: float):
+        self.intervals[pr_number] = interval
+        self.next_poll[pr_number] = time.monotonic() + interval
+
+    def boost(self, pr_number: int, interval: float = FAST_INTERVAL):
+        """Poll a PR soon, e.g. right after triggering Copilot or on a webhook event"""
+        self._set(pr_number, min(interval, self.intervals.get(pr_number, interval)))
+
+    def observe(self, pr_number: int, fingerprint: Hashable, urgent_interval: Optional[float] = None) -> bool:
+        """
+        Record a poll result and schedule the next poll; returns True if the state changed
+        urgent_interval restarts the PR on a short interval (CI pending, UNKNOWN mergeable)
+        and caps its backoff at the base interval
+        """
+        self.polls += 1
+        changed = pr_number in self.fingerprints and self.fingerprints[pr_number] != fingerprint
+        self.fingerprints[pr_number] = fingerprint
+        current = self.intervals.get(pr_number)
+
+        if urgent_interval is not None:
+            if changed or current is None:
+                interval = urgent_interval
+            else:
+                interval = min(current * self.factor, max(self.base, urgent_interval))
+        elif changed or current is None:
+            interval = self.base
+        else:
+            interval = min(current * self.factor, self.max_interval)
+
+        self._set(pr_number, interval)
+        return changed
+
+    def backoff(self, pr_number: int):
+        """Push a PR's next poll out without new information, e.g. after a failed request"""
+        current = self.intervals.get(pr_number, self.base)
+        self._set(pr_number, min(current * self.factor, self.max_interval))
+
+    def remove(self, pr_number: int):
+        self.intervals.pop(pr_number, None)
+        self.next_poll.pop(pr_number, None)
+        self.fingerprints.pop(pr_number, None)
+
+    def due(self, window: float = COALESCE_WINDOW) -> List[int]:
+        """PRs whose poll is due now or within window seconds"""
+        horizon = time.monotonic() + window
+        return sorted(n for n, at in self.next_poll.items() if at <= horizon)
+
+    def seconds_until_next(self) -> float:
+        """Time until the earliest scheduled poll, or max_interval if nothing is scheduled"""
+        if not self.next_poll:
+            return self.max_interval
+        return max(0.0, min(self.next_poll.values()) - time.monotonic())
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+PR Client - In-process GitHub pull request client
+
+Replaces the gh CLI subprocesses used by PROrchestrator and AutoMergeMonitor.
+Every call goes through the shared pooled GitHubClient session, returns a typed
+CallResult and records its latency.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Set
+from urllib.parse import quote
+from github_client import GitHubClient, chunked
+
+PAGE_SIZE = 100  # GraphQL maximum
+FILES_BATCH_SIZE = 20  # PRs per aliased changed-files query
+
+PR_FIELDS = """
+  id
+  number
+  title
+  isDraft
+  state
+  mergeable
+  headRefName
+  createdAt
+  additions
+  deletions
+  commits(last: 1) { nodes { commit { statusCheckRollup { state } } } }
+"""
+
+@dataclass
+class PullRequest:
+    number: int
+    title: str
+    is_draft: bool
+    state: str
+    mergeable: str  # MERGEABLE, CONFLICTING or UNKNOWN
+    head_ref: str
+    node_id: str
+    created_at: str = ""
+    additions: int = 0
+    deletions: int = 0
+    ci_state: str = ""  # statusCheckRollup of the head commit, e.g. PENDING or SUCCESS
+
+    @classmethod
+    def from_graphql(cls, node: Dict) -> "PullRequest":
+        commits = (node.get("commits") or {}).get("nodes") or []
+        rollup = commits[0]["commit"]["statusCheckRollup"] if commits else None
+        return cls(
+            number=node["number"],
+            title=node["title"],
+            is_draft=node["isDraft"],
+            state=node["state"],
+            mergeable=node["mergeable"],
+            head_ref=node["headRefName"],
+            node_id=node["id"],
+            created_at=node.get("createdAt", ""),
+            additions=node.get("additions", 0),
+            deletions=node.get("deletions", 0),
+            ci_state=rollup["state"] if rollup else ""
+        )
+
+@dataclass
+class CallResult:
+    """Outcome of one client call; value holds the typed payload"""
+    ok: bool
+    latency: float
+    value: Any = None
+    error: str = ""
+    status: int = 0
+
+@dataclass
+class CallStats:
+    calls: int = 0
+    failures: int = 0
+    total_latency: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+
+class PRClient:
+    """Pull request operations over the GitHub REST and GraphQL APIs"""
+
+    def __init__(self, repo: str, token: Optional[str] = None, client: Optional[GitHubClient] = None):
+        self.repo = repo
+        self.owner, self.name = repo.split("/")
+        self.client = client or GitHubClient(token)
+        self.stats: Dict[str, CallStats] = {}
+        self.lock = threading.Lock()  # Merges may run on several threads
+
+    def _record(self, operation: str, started: float, ok: bool, value: Any = None,
+                error: str = "", status: int = 0) -> CallResult:
+        latency = time.perf_counter() - started
+        with self.lock:
+            stats = self.stats.setdefault(operation, CallStats())
+            stats.calls += 1
+            stats.total_latency += latency
+            stats.latencies.append(latency)
+            if not ok:
+                stats.failures += 1
+        return CallResult(ok=ok, latency=latency, value=value, error=error, status=status)
+
+    def _graphql(self, operation: str, query: str, variables: Dict, extract) -> CallResult:
+        started = time.perf_counter()
+        try:
+            result = self.client.graphql(query, variables)
+        except Exception as e:
+            return self._record(operation, started, False, error=str(e))
+
+        if result.get("errors"):
+            return self._record(operation, started, False, error=str(result["errors"]))
+        return self._record(operation, started, True, value=extract(result["data"]))
+
+    def _rest(self, operation: str, method: str, path: str, **kwargs) -> CallResult:
+        started = time.perf_counter()
+        try:
+            response = self.client.request(method, path, **kwargs)
+        except Exception as e:
+            return self._record(operation, started, False, error=str(e))
+
+        ok = response.status_code < 300
+        value = response.json() if response.content and "json" in response.headers.get("Content-Type", "") else None
+        error = ""
+        if not ok:
+            error = value.get("message", response.text) if isinstance(value, dict) else response.text
+        return self._record(operation, started, ok, value=value, error=error, status=response.status_code)
+
+    def _paginate(self, operation: str, query: str, variables: Dict, connection) -> Iterator[CallResult]:
+        """
+        Follow a cursor-paginated connection, yielding one CallResult per page
+        Each page's value is a List[PullRequest]; iteration stops after a failed page
+        """
+        cursor = None
+        while True:
+            result = self._graphql(operation, query, dict(variables, after=cursor), connection)
+            if not result.ok:
+                yield result
+                return
+
+            page = result.value
+            # Search results can include non-PR nodes, which come back as empty objects
+            result.value = [PullRequest.from_graphql(n) for n in page["nodes"] if n]
+            yield result
+
+            if not page["pageInfo"]["hasNextPage"]:
+                return
+            cursor = page["pageInfo"]["endCursor"]
+
+    def _collect(self, pages: Iterator[CallResult]) -> CallResult:
+        """Drain a page iterator into one CallResult with the combined list and latency"""
+        prs: List[PullRequest] = []
+        latency = 0.0
+        for page in pages:
+            latency += page.latency
+            if not page.ok:
+                return CallResult(ok=False, latency=latency, value=prs, error=page.error, status=page.status)
+            prs.extend(page.value)
+        return CallResult(ok=True, latency=latency, value=prs)
+
+    def list_pr_pages(self, state: str = "OPEN", page_size: int = PAGE_SIZE) -> Iterator[CallResult]:
+        """Page through every pull request in a state, oldest first"""
+        query = """
+        query($owner: String!, $name: String!, $states: [PullRequestState!], $first: Int!, $after: String) {
+          repository(owner: $owner, name: $name) {
+            pullRequests(states: $states, first: $first, after: $after, orderBy: {field: CREATED_AT, direction: ASC}) {
+              pageInfo { hasNextPage endCursor }
+              nodes {%s}
+            }
+          }
+        }
+        """ % PR_FIELDS
+        variables = {"owner": self.owner, "name": self.name, "states": [state], "first": page_size}
+        return self._paginate("list_prs", query, variables, lambda data: data["repository"]["pullRequests"])
+
+    def list_prs(self, state: str = "OPEN", page_size: int = PAGE_SIZE) -> CallResult:
+        """List all pull requests in a state; value is a List[PullRequest]"""
+        return self._collect(self.list_pr_pages(state, page_size))
+
+    def search_pr_pages(self, qualifiers: str, page_size: int = PAGE_SIZE) -> Iterator[CallResult]:
+        """
+        Page through pull requests matching search qualifiers, e.g. "is:open is:draft"
+        Filtering happens server-side; GitHub caps a search at 1000 results
+        """
+        query = """
+        query($q: String!, $first: Int!, $after: String) {
+          search(type: ISSUE, query: $q, first: $first, after: $after) {
+            pageInfo { hasNextPage endCursor }
+            nodes { ... on PullRequest {%s} }
+          }
+        }
+        """ % PR_FIELDS
+        variables = {"q": f"repo:{self.repo} is:pr {qualifiers}", "first": page_size}
+        return self._paginate("search_prs", query, variables, lambda data: data["search"])
+
+    def view_pr(self, number: int) -> CallResult:
+        """Fetch one pull request; value is a PullRequest or None"""
+        query = """
+        query($owner: String!, $name: String!, $number: Int!) {
+          repository(owner: $owner, name: $name) {
+            pullRequest(number: $number) {%s}
+          }
+        }
+        """ % PR_FIELDS
+        variables = {"owner": self.owner, "name": self.name, "number": number}
+
+        def extract(data):
+            node = data["repository"]["pullRequest"]
+            return PullRequest.from_graphql(node) if node else None
+
+        return self._graphql("view_pr", query, variables, extract)
+
+    def changed_files(self, numbers: List[int]) -> CallResult:
+        """
+        Fetch the changed-file paths of many PRs with aliased queries
+        value is Dict[int, Set[str]]; PRs with more than one page of files are followed up one by one
+        """
+        started = time.perf_counter()
+        files: Dict[int, Set[str]] = {}
+        cursors: Dict[int, str] = {}
+
+        for batch in chunked(numbers, FILES_BATCH_SIZE):
+            fields = "".join(
+                f"""
+                p{n}: pullRequest(number: {n}) {{
+                  files(first: {PAGE_SIZE}) {{ pageInfo {{ hasNextPage endCursor }} nodes {{ path }} }}
+                }}"""
+                for n in batch
+            )
+            query = """
+            query($owner: String!, $name: String!) {
+              repository(owner: $owner, name: $name) {%s
+              }
+            }
+            """ % fields
+            result = self._graphql("changed_files", query, {"owner": self.owner, "name": self.name},
+                                   lambda data: data["repository"])
+            if not result.ok:
+                return CallResult(ok=False, latency=time.perf_counter() - started, value=files, error=result.error)
+
+            for n in batch:
+                connection = (result.value.get(f"p{n}") or {}).get("files") or {"nodes": [], "pageInfo": {}}
+                files[n] = {node["path"] for node in connection["nodes"]}
+                if connection["pageInfo"].get("hasNextPage"):
+                    cursors[n] = connection["pageInfo"]["endCursor"]
+
+        query = """
+        query($owner: String!, $name: String!, $number: Int!, $after: String) {
+          repository(owner: $owner, name: $name) {
+            pullRequest(number: $number) {
+              files(first: %d, after: $after) { pageInfo { hasNextPage endCursor } nodes { path } }
+            }
+          }
+        }
+        """ % PAGE_SIZE
+        for n, cursor in cursors.items():
+            while cursor:
+                variables = {"owner": self.owner, "name": self.name, "number": n, "after": cursor}
+                result = self._graphql("changed_files", query, variables,
+                                       lambda data: data["repository"]["pullRequest"]["files"])
+                if not result.ok:
+                    return CallResult(ok=False, latency=time.perf_counter() - started, value=files, error=result.error)
+                files[n].update(node["path"] for node in result.value["nodes"])
+                page_info = result.value["pageInfo"]
+                cursor = page_info["endCursor"] if page_info["hasNextPage"] else None
+
+        return CallResult(ok=True, latency=time.perf_counter() - started, value=files)
+
+    def comment(self, number: int, body: str) -> CallResult:
+        """Add a comment to a pull request"""
+        return self._rest("comment", "POST", f"/repos/{self.repo}/issues/{number}/comments", json={"body": body})
+
+    def merge(self, number: int, method: str = "squash", head_ref: Optional[str] = None,
+              delete_branch: bool = False) -> CallResult:
+        """Merge a pull request, optionally deleting its head branch afterwards"""
+        result = self._rest("merge", "PUT", f"/repos/{self.repo}/pulls/{number}/merge", json={"merge_method": method})
+
+        if result.ok and delete_branch and head_ref:
+            self._rest("delete_branch", "DELETE", f"/repos/{self.repo}/git/refs/heads/{quote(head_ref, safe='')}")
+
+        return result
+
+    def mark_ready(self, pr: PullRequest) -> CallResult:
+        """Convert a draft pull request to ready for review"""
+        query = """
+        mutation($id: ID!) {
+          markPullRequestReadyForReview(input: {pullRequestId: $id}) {
+            pullRequest { isDraft }
+          }
+        }
+        """
+        return self._graphql(
+            "mark_ready", query, {"id": pr.node_id},
+            lambda data: data["markPullRequestReadyForReview"]["pullRequest"]
+        )
+
+    def enable_auto_merge(self, pr: PullRequest, method: str = "SQUASH") -> CallResult:
+        """Let GitHub merge the PR itself once its requirements pass (serialized server-side)"""
+        query = """
+        mutation($id: ID!, $method: PullRequestMergeMethod!) {
+          enablePullRequestAutoMerge(input: {pullRequestId: $id, mergeMethod: $method}) {
+            pullRequest { number }
+          }
+        }
+        """
+        return self._graphql(
+            "enable_auto_merge", query, {"id": pr.node_id, "method": method},
+            lambda data: data["enablePullRequestAutoMerge"]["pullRequest"]
+        )
+
+    def latency_report(self) -> List[str]:
+        """One line per operation with call count, failures and latency"""
+        lines = []
+        for operation, stats in sorted(self.stats.items()):
+            average = stats.total_latency / stats.calls
+            lines.append(
+                f"{operation}: {stats.calls} calls, {stats.failures} failed, "
+                f"avg {average * 1000:.0f}ms, max {max(stats.latencies) * 1000:.0f}ms"
+            )
+        return lines
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+PR Events - Webhook receiver for event-driven PR status tracking
+
+Consumes GitHub pull_request, issue_comment and check_suite webhooks and puts
+parsed PREvent objects on a queue, so the orchestrator reacts as soon as an
+event arrives instead of waiting for the next poll.
+
+For local runs and tests, recorded deliveries can be replayed from a JSONL file
+with one {"event": ..., "payload": ..., "delay": seconds} object per line.
+"""
+
+import hashlib
+import hmac
+import json
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+WEBHOOK_HOST = "127.0.0.1"
+WEBHOOK_PORT = 8787
+
+@dataclass
+class PREvent:
+    """A webhook event reduced to what the orchestrator needs"""
+    event: str
+    action: str
+    pr_numbers: List[int]
+    author: str = ""
+    body: str = ""
+    is_draft: Optional[bool] = None
+    merged: bool = False
+    conclusion: str = ""
+
+def parse_event(event_name: str, payload: Dict) -> Optional[PREvent]:
+    """Turn a webhook payload into a PREvent, or None if it is not about a pull request"""
+    action = payload.get("action", "")
+
+    if event_name == "pull_request":
+        pr = payload.get("pull_request", {})
+        return PREvent(
+            event=event_name,
+            action=action,
+            pr_numbers=[pr["number"]],
+            author=(pr.get("user") or {}).get("login", ""),
+            is_draft=pr.get("draft"),
+            merged=bool(pr.get("merged"))
+        )
+
+    if event_name == "issue_comment":
+        issue = payload.get("issue", {})
+        if "pull_request" not in issue:
+            return None
+        comment = payload.get("comment", {})
+        return PREvent(
+            event=event_name,
+            action=action,
+            pr_numbers=[issue["number"]],
+            author=(comment.get("user") or {}).get("login", ""),
+            body=comment.get("body", "")
+        )
+
+    if event_name == "check_suite":
+        suite = payload.get("check_suite", {})
+        numbers = [pr["number"] for pr in suite.get("pull_requests", [])]
+        if not numbers:
+            return None
+        return PREvent(
+            event=event_name,
+            action=action,
+            pr_numbers=numbers,
+            conclusion=suite.get("conclusion") or ""
+        )
+
+    return None
+
+def verify_signature(secret: str, body: bytes, signature: str) -> bool:
+    """Check an X-Hub-Signature-256 header against the shared webhook secret"""
+    expected = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature or "")
+
+class PREventReceiver:
+    """Local HTTP server that queues PR webhook events"""
+
+    def __init__(self, host: str = WEBHOOK_HOST, port: int = WEBHOOK_PORT, secret: Optional[str] = None):
+        self.host = host
+        self.port = port
+        self.secret = secret
+        self.events: "queue.Queue[PREvent]" = queue.Queue()
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    def put(self, event_name: str, payload: Dict) -> Optional[PREvent]:
+        """Parse and queue one delivery; used by the HTTP handler and by replay"""
+        event = parse_event(event_name, payload)
+        if event:
+            self.events.put(event)
+        return event
+
+    def start(self):
+        """Start serving webhooks on a background thread"""
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+                if receiver.secret and not verify_signature(
+                    receiver.secret, body, self.headers.get("X-Hub-Signature-256")
+                ):
+                    self.send_response(401)
+                    self.end_headers()
+                    return
+
+                try:
+                    payload = json.loads(body or b"{}")
+                except ValueError:
+                    self.send_response(400)
+                    self.end_headers()
+                    return
+
+                receiver.put(self.headers.get("X-GitHub-Event", ""), payload)
+                self.send_response(202)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        """Stop the HTTP server"""
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def replay(self, path: str, realtime: bool = True) -> threading.Thread:
+        """
+        Feed recorded deliveries from a JSONL file into the queue on a background thread
+        Stands in for GitHub when running locally or in tests
+        """
+        def feed():
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    delivery = json.loads(line)
+                    if realtime and delivery.get("delay"):
+                        time.sleep(delivery["delay"])
+                    self.put(delivery["event"], delivery["payload"])
+
+        thread = threading.Thread(target=feed, daemon=True)
+        thread.start()
+        return thread
+
+    def wait(self, timeout: float) -> List[PREvent]:
+        """Block up to timeout seconds for the first event, then drain whatever else is queued"""
+        try:
+            events = [self.events.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
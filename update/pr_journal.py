@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+PR Journal - Crash-safe, append-only record of orchestrator progress
+
+Every Copilot trigger and every PR outcome is appended to a JSONL file and
+fsynced before the orchestrator moves on. Replaying the file on startup
+restores which PRs are in flight and which are done, so a restart resumes
+monitoring instead of posting a second @copilot comment.
+
+A trigger is written in two steps: "trigger_intent" before the comment is
+posted and "trigger" once GitHub accepted it. An intent without a matching
+trigger means the process died mid-request; the orchestrator checks the PR's
+comments to find out whether the trigger landed.
+"""
+
+import json
+import os
+import time
+from typing import Dict
+
+JOURNAL_FILE = "pr_orchestrator_journal.jsonl"
+
+class PRJournal:
+    """Append-only JSONL journal of triggers and transitions"""
+
+    def __init__(self, path: str = JOURNAL_FILE):
+        self.path = path
+        self.pending: Dict[int, Dict] = {}  # Trigger intents not yet confirmed
+        self.triggered: Dict[int, Dict] = {}  # Triggered and not finished
+        self.finished: Dict[int, Dict] = {}  # PR number -> final entry
+        self.replayed = 0
+        self._load()
+        self.file = open(path, "a", encoding="utf-8")
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+
+        good_offset = 0
+        needs_newline = False
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A crash mid-write leaves at most one torn line at the end
+                    break
+                self._apply(entry)
+                self.replayed += 1
+                good_offset += len(line)
+                needs_newline = not line.endswith(b"\n")
+
+        # Cut off the torn tail so later appends are not stranded behind it
+        with open(self.path, "r+b") as f:
+            f.truncate(good_offset)
+            if needs_newline:
+                f.seek(good_offset)
+                f.write(b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _apply(self, entry: Dict):
+        pr_number = entry["pr"]
+
+        if entry["type"] == "trigger_intent":
+            self.pending[pr_number] = entry
+        elif entry["type"] == "trigger":
+            self.pending.pop(pr_number, None)
+            self.triggered[pr_number] = entry
+        elif entry["type"] == "finish":
+            self.pending.pop(pr_number, None)
+            self.triggered.pop(pr_number, None)
+            self.finished[pr_number] = entry
+
+    def append(self, entry_type: str, pr_number: int, **fields) -> Dict:
+        """Durably append one entry and apply it to the in-memory view"""
+        entry = {"ts": time.time(), "type": entry_type, "pr": pr_number, **fields}
+        self.file.write(json.dumps(entry) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self._apply(entry)
+        return entry
+
+    def trigger_intent(self, pr_number: int, title: str):
+        self.append("trigger_intent", pr_number, title=title)
+
+    def trigger(self, pr_number: int, title: str):
+        self.append("trigger", pr_number, title=title)
+
+    def finish(self, pr_number: int, outcome: str, title: str = "", reason: str = ""):
+        self.append("finish", pr_number, outcome=outcome, title=title, reason=reason)
+
+    def close(self):
+        self.file.close()
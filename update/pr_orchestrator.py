@@ -3,31 +3,75 @@
 PR Orchestrator - Manages completion of draft PRs via GitHub Copilot
 
 This orchestrator:
-- Processes up to 3 draft PRs in parallel
+- Keeps up to 3 draft PRs in flight, refilling a slot as soon as one finishes
 - Triggers Copilot to complete each PR
 - Monitors status and handles conflicts
 - Marks PRs for review if issues arise
+- Polls each PR on its own adaptive schedule (fast after a trigger, backing off while idle)
+- Reacts to webhook events as they arrive, polling only as a fallback
+- Journals triggers and outcomes so a restart resumes without re-triggering Copilot
 - Continues until all PRs are complete
 """
 
 import subprocess
-import json
 import time
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Dict, Iterator, List, Optional
 import sys
+import os
+from collections import deque
+import argparse
+from pr_events import PREvent, PREventReceiver
+from pr_client import PRClient, PullRequest
+from poll_schedule import PollSchedule, FAST_INTERVAL, UNKNOWN_INTERVAL, MAX_INTERVAL, POLLING_MAX_INTERVAL
+from pr_journal import PRJournal, JOURNAL_FILE
 
 REPO = "pixelsock/fuma"
 MAX_WORKERS = 3
-CHECK_INTERVAL = 60  # Check status every 60 seconds
-COMMENT_DELAY = 3    # Delay between comments to avoid rate limits
+PRIORITIES = ("fifo", "oldest", "smallest")
+COMMENT_PAGE_SIZE = 50
+DRAFT_PAGE_SIZE = 25  # Small pages so the first slots fill while later pages are still unfetched
+
+TRIGGER_COMMENT = """@copilot please complete this PR and mark it ready for review.
+
+**Instructions:**
+1. Review the issue requirements carefully
+2. Implement all necessary changes
+3. Ensure all checks pass
+4. Remove [WIP] from the title when complete
+5. Mark the PR as ready for review (convert from draft)
+6. If you encounter any conflicts, please resolve them
+7. If you're unsure about any requirements, add a comment asking for clarification
+
+The area requiring changes is highlighted with a light purple circle indicator in the screenshot (if applicable).
+
+Please proceed with completing this work."""
 
 class PROrchestrator:
-    def __init__(self):
-        self.draft_prs: List[Dict] = []
+    def __init__(self, events: Optional[PREventReceiver] = None,
+                 max_workers: int = MAX_WORKERS, priority: str = "fifo",
+                 journal: Optional[PRJournal] = None):
+        self.events = events  # Webhook receiver; polling is only a fallback when set
+        self.journal = journal  # Durable trigger/outcome log; state is memory-only without it
+        self.max_workers = max_workers
+        self.priority = priority
+        self.draft_prs: List[PullRequest] = []
         self.active_workers: List[int] = []  # PR numbers being processed
         self.completed_prs: List[int] = []
         self.failed_prs: List[Dict] = []
+        self.slots: Dict[int, int] = {}  # PR number -> worker slot
+        self.started_at: Dict[int, float] = {}
+        self.titles: Dict[int, str] = {}
+        self.resumed_prs: List[int] = []
+        self.seen_prs = set()  # Every draft PR already handed to the scheduler
+        self.slot_metrics: List[Dict] = []
+        self.comment_cursors: Dict[int, str] = {}  # Last comment seen per PR
+        self.last_status: Dict[int, Dict] = {}
+        # Without webhooks a poll is the only way to notice a change, so back off less
+        self.schedule = PollSchedule(max_interval=MAX_INTERVAL if events else POLLING_MAX_INTERVAL)
+        self.poll_requests = 0
+        self.prs = PRClient(REPO, self.get_github_token())
+        self.client = self.prs.client  # Shares the pooled session and rate-limit scheduler with the PR client
 
     def log(self, message: str, level: str = "INFO"):
         """Log message with timestamp"""
@@ -35,95 +79,195 @@ class PROrchestrator:
         print(f"[{timestamp}] [{level}] {message}")
         sys.stdout.flush()
 
-    def run_gh_command(self, cmd: List[str]) -> Optional[str]:
-        """Run gh CLI command and return output"""
+    def get_github_token(self) -> Optional[str]:
+        """Get GitHub token from environment variable or, once at startup, the gh CLI"""
+        token = os.environ.get('GITHUB_TOKEN')
+        if token:
+            return token
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=True
-            )
+            result = subprocess.run(['gh', 'auth', 'token'], capture_output=True, text=True, check=True)
             return result.stdout.strip()
-        except subprocess.CalledProcessError as e:
-            self.log(f"Command failed: {' '.join(cmd)}", "ERROR")
-            self.log(f"Error: {e.stderr}", "ERROR")
+        except (OSError, subprocess.CalledProcessError) as e:
+            self.log(f"Could not read token from gh CLI: {e}", "ERROR")
             return None
 
-    def get_draft_prs(self) -> List[Dict]:
-        """Get all draft PRs from the repository"""
-        self.log("Fetching all draft PRs...")
-
-        output = self.run_gh_command([
-            'gh', 'pr', 'list',
-            '--repo', REPO,
-            '--state', 'open',
-            '--json', 'number,title,isDraft,headRefName',
-            '--limit', '100'
-        ])
-
-        if not output:
-            return []
-
-        all_prs = json.loads(output)
-        draft_prs = [pr for pr in all_prs if pr['isDraft']]
-
-        self.log(f"Found {len(draft_prs)} draft PRs out of {len(all_prs)} total open PRs")
-        return draft_prs
-
-    def get_pr_status(self, pr_number: int) -> Dict:
-        """Get detailed status of a specific PR"""
-        output = self.run_gh_command([
-            'gh', 'pr', 'view', str(pr_number),
-            '--repo', REPO,
-            '--json', 'number,title,isDraft,state,mergeable,statusCheckRollup,comments'
-        ])
-
-        if not output:
+    def get_draft_prs(self) -> Iterator[List[PullRequest]]:
+        """
+        Stream draft PRs page by page, filtered server-side with an is:draft search
+        Search pagination is offset-based, so PRs that leave draft state while we work
+        shift later results onto pages we already read; the search is repeated until a
+        pass turns up no PR we have not seen
+        """
+        order = "asc" if self.priority == "oldest" else "desc"
+        qualifiers = f"is:open is:draft sort:created-{order}"
+
+        while True:
+            self.log("Fetching draft PRs...")
+            found = 0
+            for page in self.prs.search_pr_pages(qualifiers, DRAFT_PAGE_SIZE):
+                if not page.ok:
+                    self.log(f"Failed to fetch draft PRs: {page.error}", "ERROR")
+                    return
+
+                new = [pr for pr in page.value if pr.number not in self.seen_prs]
+                self.seen_prs.update(pr.number for pr in new)
+                self.draft_prs.extend(new)
+                found += len(new)
+                self.log(f"Fetched {len(page.value)} draft PRs ({len(new)} new, "
+                         f"{len(self.draft_prs)} so far, {page.latency * 1000:.0f}ms)")
+                yield new
+
+            if not found:
+                return
+
+    def poll_prs(self, pr_numbers: List[int]) -> Dict[int, Dict]:
+        """
+        Fetch status of many PRs in one aliased GraphQL query
+        Only comments created since each PR's last seen cursor are downloaded
+        A PR GitHub reports as NOT_FOUND maps to None; PRs missing from the reply for any
+        other reason (timeouts, document-level errors) are left out so callers retry them
+        """
+        if not pr_numbers:
             return {}
 
-        return json.loads(output)
+        with_cursor = [n for n in pr_numbers if self.comment_cursors.get(n)]
+        params = ''.join(f', $c{n}: String' for n in with_cursor)
+        fields = []
+        for n in pr_numbers:
+            # First poll of a PR: recent comments only; afterwards: everything after the cursor
+            if n in with_cursor:
+                comments = f'comments(first: {COMMENT_PAGE_SIZE}, after: $c{n})'
+            else:
+                comments = f'comments(last: {COMMENT_PAGE_SIZE})'
+
+            fields.append(f"""
+            p{n}: pullRequest(number: {n}) {{
+              number
+              title
+              isDraft
+              state
+              mergeable
+              commits(last: 1) {{ nodes {{ commit {{ statusCheckRollup {{ state }} }} }} }}
+              {comments} {{
+                pageInfo {{ endCursor }}
+                nodes {{ author {{ login }} body createdAt }}
+              }}
+            }}""")
+
+        owner, name = REPO.split('/')
+        query = f"""
+        query($owner: String!, $name: String!{params}) {{
+          repository(owner: $owner, name: $name) {{{''.join(fields)}
+          }}
+        }}
+        """
+        variables = {'owner': owner, 'name': name}
+        variables.update({f'c{n}': self.comment_cursors[n] for n in with_cursor})
+
+        self.poll_requests += 1
+        result = self.client.graphql(query, variables)
+        repository = (result.get('data') or {}).get('repository') or {}
+        errors = result.get('errors') or []
+        not_found = {
+            e['path'][-1] for e in errors
+            if e.get('type') == 'NOT_FOUND' and len(e.get('path') or []) == 2
+        }
+        if errors and not repository:
+            self.log(f"Status poll returned no data: {errors[0].get('message', errors[0])}", "ERROR")
+        statuses = {}
+
+        for n in pr_numbers:
+            pr = repository.get(f'p{n}')
+            if not pr:
+                if f'p{n}' in not_found:
+                    statuses[n] = None
+                continue
+
+            connection = pr.pop('comments') or {}
+            if connection.get('pageInfo', {}).get('endCursor'):
+                self.comment_cursors[n] = connection['pageInfo']['endCursor']
+
+            commits = pr.pop('commits')['nodes']
+            rollup = commits[0]['commit']['statusCheckRollup'] if commits else None
+            pr['statusCheckRollup'] = rollup['state'] if rollup else None
+            pr['comments'] = connection.get('nodes', [])
+
+            statuses[n] = pr
+            self.last_status[n] = pr
+
+        return statuses
 
     def trigger_copilot_completion(self, pr_number: int, pr_title: str):
         """Add comment to PR to trigger Copilot to complete the work"""
         self.log(f"Triggering Copilot completion for PR #{pr_number}: {pr_title}")
 
-        comment = """@copilot please complete this PR and mark it ready for review.
-
-**Instructions:**
-1. Review the issue requirements carefully
-2. Implement all necessary changes
-3. Ensure all checks pass
-4. Remove [WIP] from the title when complete
-5. Mark the PR as ready for review (convert from draft)
-6. If you encounter any conflicts, please resolve them
-7. If you're unsure about any requirements, add a comment asking for clarification
-
-The area requiring changes is highlighted with a light purple circle indicator in the screenshot (if applicable).
-
-Please proceed with completing this work."""
+        if self.journal:
+            self.journal.trigger_intent(pr_number, pr_title)
 
-        result = self.run_gh_command([
-            'gh', 'pr', 'comment', str(pr_number),
-            '--repo', REPO,
-            '--body', comment
-        ])
+        result = self.prs.comment(pr_number, TRIGGER_COMMENT)
 
-        if result is not None:
-            self.log(f"✓ Comment added to PR #{pr_number}")
+        if result.ok:
+            self.log(f"✓ Comment added to PR #{pr_number} ({result.latency * 1000:.0f}ms)")
+            if self.journal:
+                self.journal.trigger(pr_number, pr_title)
             return True
         else:
-            self.log(f"✗ Failed to add comment to PR #{pr_number}", "ERROR")
+            self.log(f"✗ Failed to add comment to PR #{pr_number}: {result.error}", "ERROR")
             return False
 
-    def check_pr_completion(self, pr_number: int) -> str:
+    def check_prs(self, pr_numbers: List[int]) -> Dict[int, str]:
+        """Check completion of many PRs with a single poll request"""
+        try:
+            polled = self.poll_prs(pr_numbers)
+        except Exception as e:
+            # Transient API failure: keep every PR active and try again later
+            self.log(f"Status poll failed: {e}", "ERROR")
+            for n in pr_numbers:
+                self.schedule.backoff(n)
+            return {n: 'in_progress' for n in pr_numbers}
+
+        # No answer for a PR is not a verdict on it: keep it active and back off
+        unanswered = [n for n in pr_numbers if n not in polled]
+        if unanswered:
+            self.log(f"No status for PRs {unanswered} - retrying later", "WARNING")
+        for n in unanswered:
+            self.schedule.backoff(n)
+
+        for n, status in polled.items():
+            if status:
+                self.reschedule(n, status)
+
+        return {
+            n: self.check_pr_completion(n, polled[n]) if n in polled else 'in_progress'
+            for n in pr_numbers
+        }
+
+    def reschedule(self, pr_number: int, status: Dict):
+        """Pick a PR's next poll time from what the last poll showed"""
+        fingerprint = (
+            status['isDraft'],
+            status['state'],
+            status['mergeable'],
+            status['statusCheckRollup'],
+            self.comment_cursors.get(pr_number)
+        )
+
+        urgent = None
+        if status['mergeable'] == 'UNKNOWN':
+            urgent = UNKNOWN_INTERVAL
+        elif status['statusCheckRollup'] in ('PENDING', 'EXPECTED'):
+            urgent = FAST_INTERVAL
+
+        self.schedule.observe(pr_number, fingerprint, urgent)
+
+    def check_pr_completion(self, pr_number: int, status: Optional[Dict]) -> str:
         """
-        Check if PR is complete
+        Check if PR is complete from its polled status
         Returns: 'completed', 'in_progress', 'failed', 'needs_review'
         """
-        status = self.get_pr_status(pr_number)
-
         if not status:
+            # Only reached for PRs GitHub reported as NOT_FOUND
+            self.log(f"PR #{pr_number} no longer exists", "ERROR")
             return 'failed'
 
         # Check if still draft
@@ -131,91 +275,223 @@ Please proceed with completing this work."""
             self.log(f"PR #{pr_number} is no longer a draft - completed!")
             return 'completed'
 
-        # Check for recent Copilot activity
+        # Check for new Copilot activity
         comments = status.get('comments', [])
         recent_copilot_comments = [
             c for c in comments
-            if c.get('author', {}).get('login') == 'copilot-swe-agent'
+            if (c.get('author') or {}).get('login') == 'copilot-swe-agent'
         ]
 
         if recent_copilot_comments:
-            latest_comment = recent_copilot_comments[-1].get('body', '')
-
-            # Check for completion indicators
-            if 'ready for review' in latest_comment.lower():
-                return 'completed'
-            elif 'clarification' in latest_comment.lower() or 'unsure' in latest_comment.lower():
-                return 'needs_review'
-            elif 'error' in latest_comment.lower() or 'failed' in latest_comment.lower():
-                return 'failed'
+            return self.classify_copilot_comment(recent_copilot_comments[-1].get('body', ''))
 
         return 'in_progress'
 
-    def process_batch(self, batch: List[Dict]):
-        """Process a batch of PRs (up to MAX_WORKERS)"""
-        self.log(f"\n{'='*80}")
-        self.log(f"Processing batch of {len(batch)} PRs")
-        self.log(f"{'='*80}\n")
-
-        # Trigger Copilot for each PR in the batch
-        for pr in batch:
-            pr_number = pr['number']
-            pr_title = pr['title']
+    def classify_copilot_comment(self, comment: str) -> str:
+        """Map a Copilot comment to a PR status using its completion indicators"""
+        comment = comment.lower()
 
-            if self.trigger_copilot_completion(pr_number, pr_title):
-                self.active_workers.append(pr_number)
-            else:
-                self.failed_prs.append({
-                    'number': pr_number,
-                    'title': pr_title,
-                    'reason': 'Failed to trigger Copilot'
-                })
-
-            # Delay between comments to avoid rate limits
-            time.sleep(COMMENT_DELAY)
-
-        # Monitor the batch until all complete or fail
-        self.monitor_batch()
-
-    def monitor_batch(self):
-        """Monitor active PRs until they complete or need review"""
-        self.log(f"\nMonitoring {len(self.active_workers)} active PRs...")
-
-        while self.active_workers:
-            self.log(f"\nActive PRs: {self.active_workers}")
-            self.log(f"Checking status in {CHECK_INTERVAL} seconds...")
-            time.sleep(CHECK_INTERVAL)
+        if 'ready for review' in comment:
+            return 'completed'
+        elif 'clarification' in comment or 'unsure' in comment:
+            return 'needs_review'
+        elif 'error' in comment or 'failed' in comment:
+            return 'failed'
 
-            still_active = []
+        return 'in_progress'
 
-            for pr_number in self.active_workers:
-                status = self.check_pr_completion(pr_number)
+    def status_from_event(self, event: PREvent) -> Optional[str]:
+        """
+        Derive a PR status straight from a webhook event
+        Returns None when the event only means the PR should be re-checked
+        """
+        if event.event == 'pull_request':
+            # Only the draft -> ready transition means Copilot is done; synchronize, edited,
+            # labeled etc. on a PR that is already ready say nothing new. A last poll that
+            # still saw a draft catches a ready_for_review delivery that was missed
+            was_draft = self.last_status.get(event.pr_numbers[0], {}).get('isDraft')
+            if event.action == 'ready_for_review' or (event.is_draft is False and was_draft is True):
+                self.log(f"PR #{event.pr_numbers[0]} is no longer a draft - completed!")
+                return 'completed'
+            if event.action == 'closed':
+                return 'completed' if event.merged else 'failed'
+            return 'in_progress'
 
-                if status == 'completed':
-                    self.log(f"✓ PR #{pr_number} completed!", "SUCCESS")
-                    self.completed_prs.append(pr_number)
+        if event.event == 'issue_comment':
+            if event.author != 'copilot-swe-agent':
+                return 'in_progress'
+            return self.classify_copilot_comment(event.body)
 
-                elif status == 'needs_review':
-                    self.log(f"⚠ PR #{pr_number} needs review - marking for user", "WARNING")
-                    self.mark_for_review(pr_number)
-                    self.completed_prs.append(pr_number)  # Count as handled
+        # check_suite results change mergeability; fetch the full status
+        return None
 
-                elif status == 'failed':
-                    self.log(f"✗ PR #{pr_number} failed", "ERROR")
-                    pr_info = self.get_pr_status(pr_number)
-                    self.failed_prs.append({
-                        'number': pr_number,
-                        'title': pr_info.get('title', 'Unknown'),
-                        'reason': 'Processing failed'
-                    })
+    def wait_for_updates(self) -> Dict[int, str]:
+        """
+        Wait for the next status changes of active PRs
+        Each PR is polled on its own schedule and all PRs due together share one request;
+        with a webhook receiver, events are handled as soon as they arrive
+        """
+        timeout = self.schedule.seconds_until_next()
+
+        if self.events is None:
+            self.log(f"Next poll in {timeout:.0f} seconds...")
+            time.sleep(timeout)
+            return self.check_prs(self.schedule.due())
+
+        events = self.events.wait(timeout)
+        if not events:
+            self.log(f"No events for {timeout:.0f} seconds - polling PRs {self.schedule.due()}")
+            return self.check_prs(self.schedule.due())
+
+        statuses: Dict[int, str] = {}
+        recheck: List[int] = []
+        for event in events:
+            for pr_number in event.pr_numbers:
+                if pr_number not in self.active_workers:
+                    continue
+
+                self.log(f"Event: {event.event}/{event.action} for PR #{pr_number}")
+                self.schedule.boost(pr_number)
+                status = self.status_from_event(event)
+                if status is None:
+                    if pr_number not in recheck:
+                        recheck.append(pr_number)
+                    continue
+
+                # A later in_progress event must not mask an earlier transition
+                if statuses.get(pr_number, 'in_progress') == 'in_progress':
+                    statuses[pr_number] = status
+
+        # Events that need a fresh look share one poll request with any scheduled polls
+        recheck.extend(n for n in self.schedule.due() if n not in recheck)
+        for pr_number, status in self.check_prs(recheck).items():
+            if statuses.get(pr_number, 'in_progress') == 'in_progress':
+                statuses[pr_number] = status
+
+        return statuses
+
+    def order_prs(self, prs: List[PullRequest]) -> List[PullRequest]:
+        """Order PRs for scheduling according to self.priority"""
+        if self.priority == "oldest":
+            return sorted(prs, key=lambda pr: pr.created_at)
+        if self.priority == "smallest":
+            return sorted(prs, key=lambda pr: pr.additions + pr.deletions)
+        return list(prs)
+
+    def start_pr(self, pr: PullRequest):
+        """Trigger Copilot on a PR and give it a free worker slot"""
+        pr_number = pr.number
+
+        if not self.trigger_copilot_completion(pr_number, pr.title):
+            self.failed_prs.append({
+                'number': pr_number,
+                'title': pr.title,
+                'reason': 'Failed to trigger Copilot'
+            })
+            if self.journal:
+                self.journal.finish(pr_number, 'failed', pr.title, 'Failed to trigger Copilot')
+            return
 
-                else:  # in_progress
-                    still_active.append(pr_number)
+        self.claim_slot(pr_number, pr.title)
+
+    def claim_slot(self, pr_number: int, title: str):
+        """Give an already-triggered PR a worker slot and start watching it"""
+        used = set(self.slots.values())
+        # Resumed PRs may outnumber max_workers if it was lowered between runs
+        slot = next(i for i in range(len(used) + 1) if i not in used)
+        self.slots[pr_number] = slot
+        self.titles[pr_number] = title
+        self.started_at[pr_number] = time.monotonic()
+        self.active_workers.append(pr_number)
+        self.schedule.boost(pr_number)  # Copilot just got triggered: watch closely
+        self.log(f"Slot {slot + 1}/{self.max_workers} -> PR #{pr_number}")
+
+    def resume_from_journal(self):
+        """Restore completed, failed and in-flight PRs from the journal"""
+        journal = self.journal
+        self.log(f"Replayed {journal.replayed} journal entries from {journal.path}")
+
+        for pr_number, entry in journal.finished.items():
+            if entry['outcome'] == 'failed':
+                self.failed_prs.append({
+                    'number': pr_number,
+                    'title': entry.get('title') or 'Unknown',
+                    'reason': entry.get('reason') or 'Processing failed'
+                })
+            else:
+                self.completed_prs.append(pr_number)
+
+        # A trigger intent without confirmation: look for the comment before posting again
+        if journal.pending:
+            unconfirmed = sorted(journal.pending)
+            try:
+                polled = self.poll_prs(unconfirmed)
+            except Exception as e:
+                self.log(f"Could not verify unconfirmed triggers: {e}", "ERROR")
+                polled = {}
+
+            for pr_number in unconfirmed:
+                title = journal.pending[pr_number].get('title', '')
+                comments = (polled.get(pr_number) or {}).get('comments', [])
+                if any(c.get('body', '').startswith(TRIGGER_COMMENT.split('\n')[0]) for c in comments):
+                    self.log(f"PR #{pr_number}: trigger comment found, confirming")
+                    journal.trigger(pr_number, title)
+
+        for pr_number, entry in sorted(journal.triggered.items()):
+            self.log(f"Resuming PR #{pr_number} without re-triggering Copilot")
+            self.claim_slot(pr_number, entry.get('title', ''))
+            self.resumed_prs.append(pr_number)
+
+    def needs_trigger(self, pr: PullRequest) -> bool:
+        """False for PRs already in flight or finished in an earlier run"""
+        if pr.number in self.active_workers:
+            return False
+        return not (self.journal and pr.number in self.journal.finished)
+
+    def finish_pr(self, pr_number: int, outcome: str):
+        """Free a PR's slot and record how long it held it"""
+        self.active_workers.remove(pr_number)
+        self.schedule.remove(pr_number)
+        slot = self.slots.pop(pr_number)
+        duration = time.monotonic() - self.started_at.pop(pr_number)
+        self.slot_metrics.append({
+            'slot': slot,
+            'pr': pr_number,
+            'outcome': outcome,
+            'duration': duration
+        })
+        self.log(f"Slot {slot + 1} freed by PR #{pr_number} after {duration / 60:.1f} min ({outcome})")
+
+    def apply_statuses(self, statuses: Dict[int, str]):
+        """Act on new PR statuses, freeing the slot of every PR that is done"""
+        for pr_number in list(self.active_workers):
+            status = statuses.get(pr_number, 'in_progress')
+
+            if status == 'completed':
+                self.log(f"✓ PR #{pr_number} completed!", "SUCCESS")
+                self.completed_prs.append(pr_number)
+
+            elif status == 'needs_review':
+                self.log(f"⚠ PR #{pr_number} needs review - marking for user", "WARNING")
+                self.mark_for_review(pr_number)
+                self.completed_prs.append(pr_number)  # Count as handled
+
+            elif status == 'failed':
+                self.log(f"✗ PR #{pr_number} failed", "ERROR")
+                pr_info = self.last_status.get(pr_number, {})
+                self.failed_prs.append({
+                    'number': pr_number,
+                    'title': pr_info.get('title') or self.titles.get(pr_number, 'Unknown'),
+                    'reason': 'Processing failed'
+                })
 
-            self.active_workers = still_active
+            else:  # in_progress
+                continue
 
-            if self.active_workers:
-                self.log(f"Still in progress: {len(self.active_workers)} PRs")
+            if self.journal:
+                self.journal.finish(pr_number, status, self.titles.get(pr_number, ''),
+                                    'Processing failed' if status == 'failed' else '')
+            self.finish_pr(pr_number, status)
 
     def mark_for_review(self, pr_number: int):
         """Mark a PR for user review by adding a comment"""
@@ -225,11 +501,9 @@ This PR requires clarification or review from the repository owner. Copilot has
 
 Please review the latest comments and provide guidance."""
 
-        self.run_gh_command([
-            'gh', 'pr', 'comment', str(pr_number),
-            '--repo', REPO,
-            '--body', comment
-        ])
+        result = self.prs.comment(pr_number, comment)
+        if not result.ok:
+            self.log(f"✗ Failed to add review comment to PR #{pr_number}: {result.error}", "ERROR")
 
     def run(self):
         """Main orchestration loop"""
@@ -237,32 +511,52 @@ Please review the latest comments and provide guidance."""
         self.log("PR Orchestrator Starting")
         self.log("="*80)
 
-        # Get all draft PRs
-        self.draft_prs = self.get_draft_prs()
-
-        if not self.draft_prs:
+        if self.journal:
+            self.resume_from_journal()
+            if self.resumed_prs:
+                self.log(f"Resumed {len(self.resumed_prs)} in-flight PRs")
+
+        # Draft PRs stream in page by page; the next page is fetched when the queue runs low
+        pages = self.get_draft_prs()
+        listing = True
+        pending: deque = deque()
+
+        def refill():
+            nonlocal listing
+            # "smallest" needs every PR's size before handing out the first slot, so it
+            # reads all pages up front instead of streaming them
+            while listing and (self.priority == "smallest" or len(pending) < self.max_workers):
+                page = next(pages, None)
+                if page is None:
+                    listing = False
+                    ordered = self.order_prs(list(pending))
+                    pending.clear()
+                    pending.extend(ordered)
+                    return
+                pending.extend(self.order_prs([pr for pr in page if self.needs_trigger(pr)]))
+
+        refill()
+        if not pending and not self.active_workers:
             self.log("No draft PRs found. Exiting.")
             return
 
-        total_prs = len(self.draft_prs)
-        self.log(f"\nTotal draft PRs to process: {total_prs}")
+        self.log(f"Running up to {self.max_workers} PRs at a time (priority: {self.priority})")
 
-        # Process PRs in batches of MAX_WORKERS
-        for i in range(0, total_prs, MAX_WORKERS):
-            batch = self.draft_prs[i:i+MAX_WORKERS]
-            batch_num = (i // MAX_WORKERS) + 1
-            total_batches = (total_prs + MAX_WORKERS - 1) // MAX_WORKERS
+        # Sliding window: refill a slot as soon as any PR finishes
+        while True:
+            while pending and len(self.active_workers) < self.max_workers:
+                self.start_pr(pending.popleft())
+                refill()
 
-            self.log(f"\n{'='*80}")
-            self.log(f"Starting Batch {batch_num}/{total_batches}")
-            self.log(f"{'='*80}")
+            if not self.active_workers:
+                if not listing:
+                    break
+                refill()
+                continue
 
-            self.process_batch(batch)
-
-            # Brief pause between batches
-            if i + MAX_WORKERS < total_prs:
-                self.log(f"\nWaiting 10 seconds before next batch...")
-                time.sleep(10)
+            self.log(f"\nActive PRs: {self.active_workers} ({len(pending)} waiting)")
+            self.apply_statuses(self.wait_for_updates())
+            refill()
 
         # Final report
         self.print_summary()
@@ -278,6 +572,8 @@ Please review the latest comments and provide guidance."""
         failed = len(self.failed_prs)
 
         self.log(f"\nTotal PRs Processed: {total}")
+        if self.resumed_prs:
+            self.log(f"↻ Resumed from journal: {self.resumed_prs}")
         self.log(f"✓ Completed: {completed}")
         self.log(f"✗ Failed: {failed}")
 
@@ -290,10 +586,50 @@ Please review the latest comments and provide guidance."""
                 self.log(f"  - PR #{pr['number']}: {pr['title']}")
                 self.log(f"    Reason: {pr['reason']}")
 
+        if self.slot_metrics:
+            self.log("\nSlot timing:")
+            for slot in sorted({m['slot'] for m in self.slot_metrics}):
+                runs = [m for m in self.slot_metrics if m['slot'] == slot]
+                busy = sum(m['duration'] for m in runs)
+                self.log(f"  Slot {slot + 1}: {len(runs)} PRs, busy {busy / 60:.1f} min, "
+                         f"avg {busy / len(runs) / 60:.1f} min per PR")
+
+        if self.poll_requests:
+            self.log(f"\nStatus polls: {self.schedule.polls} PR checks in {self.poll_requests} requests "
+                     f"({self.poll_requests / max(time.monotonic() - self.schedule.started, 1) * 3600:.0f} requests/hour)")
+
+        if self.prs.stats:
+            self.log("\nGitHub call latency:")
+            for line in self.prs.latency_report():
+                self.log(f"  {line}")
+
         self.log("\n" + "="*80)
 
 if __name__ == "__main__":
-    orchestrator = PROrchestrator()
+    parser = argparse.ArgumentParser(description="Complete draft PRs via GitHub Copilot.")
+    parser.add_argument("--webhook-port", type=int, help="Receive GitHub webhooks on this local port")
+    parser.add_argument("--webhook-secret", default=os.environ.get("GITHUB_WEBHOOK_SECRET"),
+                        help="Shared secret for X-Hub-Signature-256 (default: $GITHUB_WEBHOOK_SECRET)")
+    parser.add_argument("--replay", help="Replay recorded webhook deliveries from a JSONL file")
+    parser.add_argument("--max-workers", type=int, default=MAX_WORKERS, help="PRs in flight at once")
+    parser.add_argument("--priority", choices=PRIORITIES, default="fifo",
+                        help="Order in which waiting PRs get a slot; smallest lists every draft PR "
+                             "before starting any, the others start while later pages are fetched")
+    parser.add_argument("--journal", default=JOURNAL_FILE,
+                        help=f"Append-only progress journal replayed on restart (default: {JOURNAL_FILE})")
+    parser.add_argument("--no-journal", action="store_true", help="Keep progress in memory only")
+    args = parser.parse_args()
+
+    events = None
+    if args.webhook_port or args.replay:
+        events = PREventReceiver(port=args.webhook_port or 0, secret=args.webhook_secret)
+        if args.webhook_port:
+            events.start()
+        if args.replay:
+            events.replay(args.replay)
+
+    journal = None if args.no_journal else PRJournal(args.journal)
+    orchestrator = PROrchestrator(events, max_workers=args.max_workers, priority=args.priority, journal=journal)
     try:
         orchestrator.run()
     except KeyboardInterrupt:
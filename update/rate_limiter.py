@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Rate-limit-aware request scheduler for the GitHub API
+Replaces fixed time.sleep pacing with GitHub's real budget:
+- primary limits from X-RateLimit-Remaining/Reset headers and GraphQL rateLimit, kept
+  per X-RateLimit-Resource so the REST core and GraphQL budgets don't overwrite each other
+- secondary limits from Retry-After
+- a token bucket for content-creating (write) requests
+"""
+
+import threading
+import time
+from datetime import datetime
+
+# GitHub asks for no more than 80 content-creating requests per minute
+WRITE_RATE = 80 / 60
+WRITE_BURST = 10
+BUDGET_RESERVE = 50
+DEFAULT_RESOURCE = 'core'
+SECONDARY_LIMIT_DELAY = 60
+
+class RateLimitScheduler:
+    """Token bucket for writes plus a primary-budget gate shared by every request"""
+
+    def __init__(self, write_rate=WRITE_RATE, write_burst=WRITE_BURST, reserve=BUDGET_RESERVE):
+        self.write_rate = write_rate
+        self.write_burst = write_burst
+        self.reserve = reserve
+
+        self.tokens = float(write_burst)
+        self.last_refill = time.monotonic()
+        self.budgets = {}  # resource -> [remaining, reset_at]
+        self.blocked_until = 0.0
+        self.total_wait = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self.last_refill
+        self.tokens = min(self.write_burst, self.tokens + elapsed * self.write_rate)
+        self.last_refill = now
+
+    def _delay(self, write, resource):
+        """Seconds to wait before the next request may go out (call with lock held)"""
+        now = time.monotonic()
+        delay = max(0.0, self.blocked_until - now)
+
+        # Primary budget nearly spent: hold until the window resets
+        remaining, reset_at = self.budgets.get(resource, (None, None))
+        if remaining is not None and remaining <= self.reserve and reset_at:
+            delay = max(delay, reset_at - time.time())
+
+        if write:
+            # A request costing more than the burst only waits for a full bucket and
+            # leaves it in debt, so the requests after it are held back instead
+            needed = min(write, self.write_burst)
+            self._refill(now)
+            if self.tokens < needed:
+                delay = max(delay, (needed - self.tokens) / self.write_rate)
+
+        return delay
+
+    def acquire(self, write=False, resource=DEFAULT_RESOURCE):
+        """
+        Block until a request may be sent; returns the seconds spent waiting
+        write is the number of write tokens the request costs (True counts as one), e.g. one
+        per mutation in an aliased GraphQL document
+        """
+        waited = 0.0
+        write = int(write)
+
+        while True:
+            with self.lock:
+                delay = self._delay(write, resource)
+                if delay <= 0:
+                    self.tokens -= write
+                    budget = self.budgets.get(resource)
+                    if budget and budget[0] is not None:
+                        budget[0] -= 1
+                    self.total_wait += waited
+                    return waited
+
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds):
+        """Hold every request for the given number of seconds"""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def update_budget(self, remaining, reset_at, resource=DEFAULT_RESOURCE):
+        """Record the primary budget of one resource; reset_at is a Unix timestamp"""
+        with self.lock:
+            self.budgets[resource] = [remaining, reset_at]
+
+    def update_from_headers(self, headers):
+        """Record the primary budget from X-RateLimit-* response headers"""
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
+        if remaining is not None and reset is not None:
+            resource = headers.get('X-RateLimit-Resource', DEFAULT_RESOURCE)
+            self.update_budget(int(remaining), int(reset), resource)
+
+    def update_from_graphql(self, rate_limit):
+        """Record the primary budget from a GraphQL rateLimit { cost remaining resetAt } field"""
+        if not rate_limit:
+            return
+
+        reset_at = datetime.fromisoformat(rate_limit['resetAt'].replace('Z', '+00:00')).timestamp()
+        self.update_budget(rate_limit['remaining'], reset_at, 'graphql')
+
+    def retry_delay(self, response):
+        """
+        Seconds to wait before retrying a rate-limited response, or None if it was not rate limited
+        Honours Retry-After for secondary limits and X-RateLimit-Reset for the primary limit
+        """
+        if response.status_code not in (403, 429):
+            return None
+
+        retry_after = response.headers.get('Retry-After')
+        if retry_after is not None:
+            return float(retry_after)
+
+        if response.headers.get('X-RateLimit-Remaining') == '0':
+            reset = int(response.headers.get('X-RateLimit-Reset', 0))
+            return max(1.0, reset - time.time())
+
+        if 'secondary rate limit' in response.text.lower():
+            return SECONDARY_LIMIT_DELAY
+
+        return None
@@ -1,58 +1,8 @@
 #!/bin/bash
 # Resolve conflicts for remaining PRs by updating with master
+# Each conflicting PR is merged with master in its own git worktree, in parallel
+# (see conflict_resolver.py). Run from a local clone or set REPO_DIR.
 
-REPO="pixelsock/fuma"
-cd /Users/nick/Sites/charlotteUDO/frontend
+REPO_DIR="${REPO_DIR:-.}"
 
-# Get list of conflicting PR numbers
-conflicting_prs=$(gh pr list --repo "$REPO" --state open --json number,mergeable --jq '.[] | select(.mergeable == "CONFLICTING") | .number')
-
-echo "Found conflicting PRs: $conflicting_prs"
-echo ""
-
-for pr in $conflicting_prs; do
-    echo "==================================================================="
-    echo "Processing PR #$pr"
-    echo "==================================================================="
-
-    # Get PR branch name
-    branch=$(gh pr view "$pr" --repo "$REPO" --json headRefName --jq '.headRefName')
-    echo "Branch: $branch"
-
-    # Fetch the branch
-    git fetch origin "$branch"
-
-    # Checkout the branch
-    git checkout "$branch"
-
-    # Try to merge master
-    echo "Attempting to merge master into $branch..."
-    if git merge origin/master --no-edit; then
-        echo "✓ Merge successful for PR #$pr"
-
-        # Push the updated branch
-        git push origin "$branch"
-        echo "✓ Pushed updated branch"
-
-        # Try to merge the PR
-        echo "Attempting to merge PR #$pr..."
-        gh pr merge "$pr" --repo "$REPO" --squash --delete-branch || echo "⚠ PR #$pr still not mergeable"
-    else
-        echo "✗ Merge conflicts detected for PR #$pr"
-        echo "Conflicts in:"
-        git diff --name-only --diff-filter=U
-
-        # Abort the merge
-        git merge --abort
-        echo "Merge aborted. Manual resolution needed."
-    fi
-
-    echo ""
-done
-
-# Return to master
-git checkout master
-
-echo "==================================================================="
-echo "Conflict resolution complete"
-echo "==================================================================="
\ No newline at end of file
+exec python3 "$(dirname "$0")/conflict_resolver.py" --repo-dir "$REPO_DIR" --merge "$@"
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Concurrent Pastel screenshot downloader with a content-addressed on-disk cache
+Images are stored as objects/<sha256>.<ext>; manifest.json maps each URL to its
+hash, ETag and Last-Modified so re-runs send conditional GETs and unchanged
+screenshots are never transferred twice
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+
+SCREENSHOTS_DIR = 'github_screenshots'
+MANIFEST_FILE = 'manifest.json'
+MAX_WORKERS = 8
+TIMEOUT = 30
+
+class ScreenshotCache:
+    """Content-addressed screenshot store shared by a bounded pool of download workers"""
+
+    def __init__(self, directory=SCREENSHOTS_DIR, max_workers=MAX_WORKERS, session=None):
+        self.directory = directory
+        self.objects_dir = os.path.join(directory, 'objects')
+        self.manifest_path = os.path.join(directory, MANIFEST_FILE)
+        self.max_workers = max_workers
+        self.lock = threading.Lock()
+        self.stats = {'downloaded': 0, 'not_modified': 0, 'failed': 0}
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+        self.session = session
+
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.manifest = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+
+    def object_path(self, sha256, url):
+        ext = os.path.splitext(urlparse(url).path)[1] or '.jpg'
+        return os.path.join(self.objects_dir, f'{sha256}{ext}')
+
+    def path_for(self, url):
+        """Return the cached file for a URL, or None"""
+        entry = self.manifest.get(url)
+        if entry and os.path.exists(entry['path']):
+            return entry['path']
+        return None
+
+    def _store(self, url, content=None, source_path=None):
+        """Write content (or link source_path) into the object store; returns the object path"""
+        if content is None:
+            with open(source_path, 'rb') as f:
+                content = f.read()
+
+        sha256 = hashlib.sha256(content).hexdigest()
+        path = self.object_path(sha256, url)
+
+        if not os.path.exists(path):
+            if source_path:
+                try:
+                    os.link(source_path, path)
+                except OSError:
+                    shutil.copy2(source_path, path)
+            else:
+                tmp_path = f'{path}.{threading.get_ident()}.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(content)
+                os.replace(tmp_path, path)
+
+        return sha256, path
+
+    def adopt(self, url, legacy_path):
+        """
+        Register a screenshot downloaded before the cache existed (e.g. comment_N.jpg)
+        Its mtime becomes Last-Modified so the next fetch is a conditional GET
+        """
+        if url in self.manifest or not os.path.exists(legacy_path):
+            return
+
+        sha256, path = self._store(url, source_path=legacy_path)
+        with self.lock:
+            self.manifest[url] = {
+                'sha256': sha256,
+                'path': path,
+                'etag': None,
+                'last_modified': formatdate(os.path.getmtime(legacy_path), usegmt=True)
+            }
+
+    def fetch(self, url):
+        """Fetch one screenshot, skipping the transfer when the server reports it unchanged"""
+        entry = self.manifest.get(url)
+        headers = {}
+        if entry and os.path.exists(entry['path']):
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=TIMEOUT)
+
+            if response.status_code == 304:
+                with self.lock:
+                    self.stats['not_modified'] += 1
+                return entry['path']
+
+            response.raise_for_status()
+            sha256, path = self._store(url, content=response.content)
+
+            with self.lock:
+                self.manifest[url] = {
+                    'sha256': sha256,
+                    'path': path,
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified')
+                }
+                self.stats['downloaded'] += 1
+            return path
+
+        except Exception as e:
+            print(f'  Error downloading screenshot {url}: {e}')
+            with self.lock:
+                self.stats['failed'] += 1
+            return self.path_for(url)
+
+    def fetch_all(self, urls):
+        """Fetch screenshots concurrently; returns {url: local path or None}"""
+        urls = list(dict.fromkeys(u for u in urls if u))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            paths = dict(zip(urls, pool.map(self.fetch, urls)))
+
+        self.save()
+        return paths
+
+    def save(self):
+        """Persist the manifest atomically"""
+        tmp_path = f'{self.manifest_path}.tmp'
+        with self.lock:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
@@ -0,0 +1,75 @@
+import subprocess
+
+import pytest
+
+from conflict_resolver import ConflictResolver
+
+
+def git(cwd, *args):
+    return subprocess.run(['git', *args], cwd=cwd, check=True, capture_output=True, text=True).stdout
+
+
+def commit_file(repo, name, content, message):
+    (repo / name).write_text(content)
+    git(repo, 'add', name)
+    git(repo, 'commit', '-q', '-m', message)
+
+
+@pytest.fixture
+def clone(tmp_path, monkeypatch):
+    """A clone of a bare origin with master plus a conflicting and a cleanly mergeable PR branch"""
+    for var in ('GIT_AUTHOR_NAME', 'GIT_COMMITTER_NAME'):
+        monkeypatch.setenv(var, 'test')
+    for var in ('GIT_AUTHOR_EMAIL', 'GIT_COMMITTER_EMAIL'):
+        monkeypatch.setenv(var, 'test@example.com')
+
+    origin = tmp_path / 'origin.git'
+    git(tmp_path, 'init', '-q', '--bare', '-b', 'master', str(origin))
+    seed = tmp_path / 'seed'
+    git(tmp_path, 'clone', '-q', str(origin), str(seed))
+    git(seed, 'checkout', '-q', '-b', 'master')
+    commit_file(seed, 'page.html', 'title\n', 'Initial page')
+    git(seed, 'push', '-q', 'origin', 'master')
+
+    git(seed, 'checkout', '-q', '-b', 'copilot/conflict')
+    commit_file(seed, 'page.html', 'pr title\n', 'Change title on PR')
+    git(seed, 'push', '-q', 'origin', 'copilot/conflict')
+
+    git(seed, 'checkout', '-q', '-b', 'copilot/clean', 'master')
+    commit_file(seed, 'footer.html', 'footer\n', 'Add footer')
+    git(seed, 'push', '-q', 'origin', 'copilot/clean')
+
+    git(seed, 'checkout', '-q', 'master')
+    commit_file(seed, 'page.html', 'master title\n', 'Change title on master')
+    git(seed, 'push', '-q', 'origin', 'master')
+
+    local = tmp_path / 'local'
+    git(tmp_path, 'clone', '-q', str(origin), str(local))
+    return local, origin
+
+
+def test_resolve_reports_conflict_merge_and_missing_branch(clone):
+    local, origin = clone
+    resolver = ConflictResolver(str(local), max_workers=2)
+    clean_head = git(origin, 'rev-parse', 'copilot/clean').strip()
+
+    results = resolver.resolve({1: 'copilot/conflict', 2: 'copilot/clean', 3: 'copilot/deleted'})
+    by_number = {r.number: r for r in results}
+
+    assert by_number[1].status == 'conflict'
+    assert by_number[1].conflicts == ['page.html']
+    assert not by_number[1].pushed
+
+    assert by_number[2].status == 'merged'
+    assert by_number[2].pushed
+    pushed_head = git(origin, 'rev-parse', 'copilot/clean').strip()
+    assert git(origin, 'rev-list', '--parents', '-n', '1', pushed_head).split()[1:] == [
+        clean_head,
+        git(origin, 'rev-parse', 'master').strip(),
+    ]
+
+    assert by_number[3].status == 'error'
+    assert by_number[3].message == 'could not fetch branch'
+
+    worktrees = git(local, 'worktree', 'list', '--porcelain').splitlines()
+    assert [line for line in worktrees if line.startswith('worktree ')] == [f'worktree {local}']
@@ -0,0 +1,28 @@
+from github_client import split_aliased_result
+
+ALIASES = ['i0', 'i1', 'i2']
+
+
+def test_document_error_does_not_fail_aliases_with_data():
+    result = {
+        'data': {'i0': {'issue': {'number': 1}}, 'i1': None, 'i2': {'issue': {'number': 3}}},
+        'errors': [
+            {'message': 'Something went wrong (timeout)'},
+            {'type': 'FORBIDDEN', 'path': ['i1'], 'message': 'Resource not accessible'},
+        ],
+    }
+
+    entries = split_aliased_result(result, ALIASES)
+
+    assert [e['data'] is not None for e in entries] == [True, False, True]
+    assert entries[0]['errors'] == [] and entries[2]['errors'] == []
+    assert [e['message'] for e in entries[1]['errors']] == ['Resource not accessible']
+
+
+def test_alias_without_data_or_own_error_carries_document_errors():
+    result = {'data': None, 'errors': [{'message': 'Something went wrong (timeout)'}]}
+
+    entries = split_aliased_result(result, ALIASES)
+
+    assert all(e['data'] is None for e in entries)
+    assert all(e['errors'] == result['errors'] for e in entries)
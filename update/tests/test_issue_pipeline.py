@@ -0,0 +1,31 @@
+import threading
+
+from issue_pipeline import Stage, run
+
+
+def test_stage_workers_are_not_capped_by_the_default_executor():
+    # More workers than asyncio's default executor allows; every one must be running at once
+    barrier = threading.Barrier(40, timeout=5)
+
+    def wait_for_all(item):
+        barrier.wait()
+        return item
+
+    stage = Stage('wait', wait_for_all, concurrency=40)
+    results = run(list(range(40)), [stage], queue_size=40)
+
+    assert sorted(results) == list(range(40))
+    assert stage.failed == 0
+
+
+def test_failures_in_a_later_stage_leave_earlier_counts_intact():
+    def comment(item):
+        if item % 2:
+            raise RuntimeError('502 Bad Gateway')
+        return item
+
+    create = Stage('create', lambda item: item, concurrency=2)
+    results = run(list(range(6)), [create, Stage('comment', comment, concurrency=2)])
+
+    assert create.processed == 6
+    assert sorted(results) == [0, 2, 4]
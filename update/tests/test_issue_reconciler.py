@@ -0,0 +1,104 @@
+import os
+
+import pytest
+
+pytest.importorskip('requests')
+
+from issue_reconciler import apply_mutations, compute_plan, fetch_issue_states, load_desired_state
+from pastel_issues import build_issue_body
+
+CSV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'pastel-comments.csv')
+
+
+def current_issue(number, title, body):
+    return {
+        'id': f'I_{number}',
+        'number': number,
+        'state': 'OPEN',
+        'title': title,
+        'body': body,
+        'assignees': {'nodes': [{'login': 'Copilot'}]},
+        'comments': {'pageInfo': {'hasPreviousPage': False, 'startCursor': None},
+                     'nodes': [{'body': 'highlighted with a light purple circle indicator'}]},
+    }
+
+
+def test_issue_body_uses_real_newlines():
+    body = build_issue_body('Fix this', 'https://user-assets.usepastel.com/screenshot/a.jpg', '1905 x 851')
+    assert body == 'Fix this\n\n<img width="1905" height="851" alt="Image" src="https://user-assets.usepastel.com/screenshot/a.jpg" />'
+
+
+def test_created_issue_needs_no_update():
+    desired = load_desired_state(CSV_PATH)
+    comment_id, want = next(iter(desired.items()))
+
+    # The issue as the creation script writes it, from the same helpers
+    current = {1: current_issue(1, want['title'], want['body'])}
+    plan = compute_plan({comment_id: want}, {comment_id: 1}, current)
+
+    assert plan == {'create': [], 'update': [], 'assign': [], 'comment': []}
+
+
+def test_titles_are_left_alone_by_default():
+    desired = load_desired_state(CSV_PATH)
+    comment_id, want = next(iter(desired.items()))
+    current = {1: current_issue(1, 'Renamed by hand', want['body'])}
+
+    assert compute_plan({comment_id: want}, {comment_id: 1}, current)['update'] == []
+    plan = compute_plan({comment_id: want}, {comment_id: 1}, current, update_titles=True)
+    assert plan['update'][0]['title'] == want['title']
+
+
+class FakeClient:
+    """Answers the reconciler's issue and comment queries from canned pages"""
+
+    def __init__(self, issue, older_pages, failing_batches=()):
+        self.issue = issue
+        self.older_pages = list(older_pages)
+        self.failing_batches = set(failing_batches)
+        self.comment_queries = 0
+        self.mutation_batches = 0
+
+    def graphql(self, query, variables):
+        if '$before' in query:
+            self.comment_queries += 1
+            return {'data': {'repository': {'issue': {'comments': self.older_pages.pop(0)}}}}
+        return {'data': {'repository': {f'i{self.issue["number"]}': self.issue}}}
+
+    def aliased_mutation(self, field, input_type, inputs, selection):
+        batch = self.mutation_batches
+        self.mutation_batches += 1
+        if batch in self.failing_batches:
+            raise RuntimeError('502 Bad Gateway')
+        return [{'alias': f'm{i}', 'data': {}, 'errors': None} for i in range(len(inputs))]
+
+
+def test_instruction_comment_found_beyond_recent_window():
+    issue = current_issue(5, 'Title', 'Body')
+    issue['comments'] = {'pageInfo': {'hasPreviousPage': True, 'startCursor': 'c2'},
+                         'nodes': [{'body': 'Copilot started work'}] * 20}
+    older = [
+        {'pageInfo': {'hasPreviousPage': True, 'startCursor': 'c1'}, 'nodes': [{'body': 'review note'}]},
+        {'pageInfo': {'hasPreviousPage': False, 'startCursor': 'c0'},
+         'nodes': [{'body': 'highlighted with a light purple circle indicator in the screenshot.'}]},
+    ]
+    client = FakeClient(issue, older)
+
+    current = fetch_issue_states(client, [5])
+    want = {'comment_number': '1', 'title': 'Title', 'body': 'Body'}
+    plan = compute_plan({'1': want}, {'1': 5}, current)
+
+    assert client.comment_queries == 2
+    assert plan['comment'] == []
+
+
+def test_failed_mutation_batch_does_not_abort_later_batches():
+    client = FakeClient(current_issue(5, 'Title', 'Body'), [], failing_batches={0})
+    failed = []
+
+    results = apply_mutations(client, 'addComment', 'AddCommentInput', [{}] * 3,
+                              ['Issue #1', 'Issue #2', 'Issue #3'], failed, batch_size=2)
+
+    assert client.mutation_batches == 2
+    assert failed == ['Issue #1', 'Issue #2']
+    assert [bool(r['errors']) for r in results] == [True, True, False]
@@ -0,0 +1,157 @@
+import asyncio
+import os
+import re
+
+import pytest
+
+pytest.importorskip('PIL')
+pytest.importorskip('openpyxl')
+async_api = pytest.importorskip('playwright.async_api')
+
+import pastel_playwright_scraper as scraper
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+BOARD_URL = 'https://usepastel.com/link/oed9q9q3/'
+
+
+def board_html():
+    with open(os.path.join(FIXTURES, 'pastel_board.html'), encoding='utf-8') as f:
+        return f.read()
+
+
+def scrape_dom(tmp_path, html):
+    """Run the DOM scraper against a saved board page; skipped where Chromium cannot start"""
+    path = tmp_path / 'board.html'
+    path.write_text(html, encoding='utf-8')
+
+    async def scrape():
+        async with async_api.async_playwright() as p:
+            try:
+                browser = await p.chromium.launch(headless=True)
+            except Exception as e:
+                pytest.skip(f'Chromium unavailable: {e}')
+            try:
+                context = await browser.new_context()
+                return await scraper.extract_comments_with_playwright(
+                    context, path.as_uri(), 'oed9q9q3', load_timeout=5, expand_timeout=2)
+            finally:
+                await browser.close()
+
+    return asyncio.run(scrape())
+
+
+def test_dom_scrape_matches_sidebar_buttons(tmp_path):
+    comments = scrape_dom(tmp_path, board_html())
+
+    assert len(comments) == 3
+    assert [c['author'] for c in comments] == ['Andrew Ausel'] * 3
+    assert comments[0]['text'] == 'Move this one to the top and have it say:\nOctober 8, 2025\nUDO Advisory Committee Meeting'
+    assert comments[1]['text'] == 'I dont think we have three recent news items - please drop this one'
+    assert comments[2]['text'] == 'Move this to #2. Adjust it to:\nJune 16, 2025\nNew Text Amendment Approved'
+    assert all(c['page_title'] == '/articles' for c in comments)
+
+
+def test_dom_scrape_falls_back_to_comment_permalinks(tmp_path):
+    # Pastel renamed its classes and the sidebar entries are no longer buttons
+    html = (board_html()
+            .replace('<button class="sidebar-comment-button">', '<div class="sidebar-entry">')
+            .replace('</button>', '</div>'))
+    comments = scrape_dom(tmp_path, html)
+
+    assert [c['id'] for c in comments] == ['c10122757', 'c10122761', 'c10122775']
+
+
+def test_dom_scrape_expand_wait_ends_on_detail_panel(tmp_path, capsys):
+    # The sidebar previews never change; only the separate detail panel renders
+    scrape_dom(tmp_path, board_html())
+
+    out = capsys.readouterr().out
+    assert 'Expanded 3 of 3 comments by clicking' in out
+    assert 'no expand signal' not in out
+
+
+def test_dom_scrape_reads_screenshots_from_detail_panel(tmp_path):
+    comments = scrape_dom(tmp_path, board_html())
+
+    assert [c['screenshot_url'] for c in comments] == [
+        'https://user-assets.usepastel.com/screenshot/KcEPa4NBz9c7Btic.jpg',
+        'https://user-assets.usepastel.com/screenshot/xgjH7wQdTMGGkfzD.jpg',
+        'https://user-assets.usepastel.com/screenshot/aYqDF4EvdVmHYKll.jpg',
+    ]
+
+
+def test_har_comments_come_only_from_pastel_comment_endpoints():
+    payloads = scraper.load_har_payloads(os.path.join(FIXTURES, 'pastel_board.har'),
+                                         re.compile(scraper.PASTEL_API_PATTERN))
+    comments = scraper.comments_from_payloads(payloads, BOARD_URL)
+
+    # The chat widget and the reviewed site's own JSON look like comments but are not read
+    assert [c['id'] for c in comments] == ['c10122757', 'c10122761']
+    assert comments[0]['author'] == 'Andrew Ausel'
+    assert comments[0]['page_url'] == 'https://new-udo.webflow.io/articles'
+    assert comments[1]['screenshot_url'] == 'https://user-assets.usepastel.com/screenshot/xgjH7wQdTMGGkfzD.jpg'
+
+
+def test_looks_like_comment_requires_numeric_id():
+    assert not scraper.looks_like_comment({'id': 'msg_1', 'text': 'Hi', 'author': 'bot'})
+    assert scraper.looks_like_comment({'id': '10122757', 'text': 'Hi', 'author': 'Andrew Ausel'})
+
+
+class FakeResponse:
+    ok = True
+    status = 200
+    headers = {'content-type': 'image/jpeg'}
+
+    def __init__(self, url):
+        self.url = url
+
+    async def body(self):
+        return self.url.encode()
+
+
+class FakeRequest:
+    def __init__(self):
+        self.urls = []
+
+    async def get(self, url):
+        self.urls.append(url)
+        return FakeResponse(url)
+
+
+def test_download_screenshots_fetches_each_url_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('pastel_screenshots')
+    shared = 'https://user-assets.usepastel.com/screenshot/KcEPa4NBz9c7Btic.jpg'
+    comments = [{'id': f'c{n}', 'screenshot_url': shared, 'screenshot_path': None} for n in (1, 2)]
+    request = FakeRequest()
+
+    asyncio.run(scraper.download_screenshots(request, comments, 'oed9q9q3'))
+
+    assert request.urls == [shared]
+    assert comments[0]['screenshot_path'] == comments[1]['screenshot_path']
+    assert os.path.exists(comments[0]['screenshot_path'])
+
+
+def test_dom_scrape_does_not_reuse_previous_panel_screenshot(tmp_path):
+    # The second comment's panel never renders, so the first comment's image stays on screen
+    comments = scrape_dom(tmp_path, board_html().replace('data-detail="1"', 'data-detail="9"'))
+
+    assert comments[0]['screenshot_url'] == 'https://user-assets.usepastel.com/screenshot/KcEPa4NBz9c7Btic.jpg'
+    assert comments[1]['screenshot_url'] is None
+
+
+def test_panel_body_drops_the_preview_header_line():
+    preview = 'Andrew Ausel Oct 1, 2025\nMove this to #2. Adjust it to: …'
+    panel = 'Andrew Ausel Oct 1, 2025\nMove this to #2. Adjust it to:\nJune 16, 2025'
+
+    assert scraper.panel_body(panel, preview) == 'Move this to #2. Adjust it to:\nJune 16, 2025'
+    assert scraper.panel_body('Just the body', preview) == 'Just the body'
+
+
+def test_comment_response_matches_whole_id_segment_on_pastel_host():
+    key = '10122757'
+    assert scraper.is_comment_response('https://api.usepastel.com/v1/comments/10122757', key)
+    assert scraper.is_comment_response('https://usepastel.com/link/oed9q9q3/comment/10122757/?x=1', key)
+    assert not scraper.is_comment_response('https://api.usepastel.com/v1/comments/101227570', key)
+    assert not scraper.is_comment_response('https://user-assets.usepastel.com/screenshot/10122757.jpg', key)
+    assert not scraper.is_comment_response('https://new-udo.webflow.io/api/10122757', key)
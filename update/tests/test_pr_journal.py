@@ -0,0 +1,40 @@
+from pr_journal import PRJournal
+
+
+def test_replay_after_torn_write_keeps_later_entries(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+
+    journal = PRJournal(path)
+    journal.trigger(1, "first")
+    journal.close()
+
+    # Simulate a crash halfway through writing the next entry
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"ts": 1, "type": "trig')
+
+    journal = PRJournal(path)
+    assert sorted(journal.triggered) == [1]
+    journal.trigger(2, "second")
+    journal.finish(1, "completed")
+    journal.close()
+
+    journal = PRJournal(path)
+    assert sorted(journal.triggered) == [2]
+    assert sorted(journal.finished) == [1]
+    assert journal.replayed == 3
+    journal.close()
+
+
+def test_complete_entry_without_newline_is_kept(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"ts": 1, "type": "trigger", "pr": 7, "title": "x"}')
+
+    journal = PRJournal(path)
+    journal.finish(7, "completed")
+    journal.close()
+
+    journal = PRJournal(path)
+    assert sorted(journal.finished) == [7]
+    assert journal.triggered == {}
+    journal.close()
@@ -0,0 +1,130 @@
+import json
+
+import pytest
+
+pytest.importorskip('requests')
+
+from pr_events import PREventReceiver, parse_event
+from pr_client import PullRequest
+from pr_orchestrator import PROrchestrator
+
+
+@pytest.fixture
+def orchestrator(monkeypatch):
+    monkeypatch.setenv('GITHUB_TOKEN', 'test-token')
+    return PROrchestrator()
+
+
+def pr_event(action, draft):
+    return parse_event('pull_request', {'action': action, 'pull_request': {'number': 12, 'draft': draft}})
+
+
+def test_ready_for_review_completes(orchestrator):
+    assert orchestrator.status_from_event(pr_event('ready_for_review', False)) == 'completed'
+
+
+def test_synchronize_on_ready_pr_is_not_completion(orchestrator):
+    assert orchestrator.status_from_event(pr_event('synchronize', False)) == 'in_progress'
+    assert orchestrator.status_from_event(pr_event('labeled', False)) == 'in_progress'
+
+
+def test_missed_ready_for_review_completes_after_draft_poll(orchestrator):
+    orchestrator.last_status[12] = {'isDraft': True}
+    assert orchestrator.status_from_event(pr_event('synchronize', False)) == 'completed'
+
+
+class StubGraphQL:
+    def __init__(self, reply):
+        self.reply = reply
+
+    def graphql(self, query, variables=None):
+        return self.reply
+
+
+def test_poll_with_document_error_keeps_prs_in_progress(orchestrator):
+    orchestrator.client = StubGraphQL({'data': None, 'errors': [{'message': 'Something went wrong (timeout)'}]})
+    for n in (11, 12):
+        orchestrator.claim_slot(n, f'PR {n}')
+
+    assert orchestrator.check_prs([11, 12]) == {11: 'in_progress', 12: 'in_progress'}
+    assert orchestrator.schedule.intervals[11] > 10  # backed off
+
+
+def test_poll_fails_only_prs_reported_not_found(orchestrator):
+    orchestrator.client = StubGraphQL({
+        'data': {'repository': {'p11': None}},
+        'errors': [{'type': 'NOT_FOUND', 'path': ['repository', 'p11'], 'message': 'Could not resolve'}],
+    })
+
+    assert orchestrator.check_prs([11, 12]) == {11: 'failed', 12: 'in_progress'}
+
+
+def test_polling_only_backoff_never_exceeds_flat_interval(orchestrator):
+    orchestrator.claim_slot(11, 'PR 11')
+    for _ in range(10):
+        orchestrator.schedule.backoff(11)
+
+    assert orchestrator.schedule.intervals[11] <= 60
+
+
+def draft(number, size):
+    return PullRequest(number=number, title=f'PR {number}', is_draft=True, state='OPEN',
+                       mergeable='MERGEABLE', head_ref=f'copilot/{number}', node_id=f'PR_{number}',
+                       additions=size)
+
+
+def test_smallest_priority_orders_across_search_pages(monkeypatch):
+    monkeypatch.setenv('GITHUB_TOKEN', 'test-token')
+    orchestrator = PROrchestrator(max_workers=1, priority='smallest')
+    pages = [[draft(1, 300), draft(2, 200)], [draft(3, 5), draft(4, 100)]]
+    started = []
+    orchestrator.get_draft_prs = lambda: iter(pages)
+    orchestrator.start_pr = lambda pr: started.append(pr.number)
+
+    orchestrator.run()
+
+    assert started == [3, 4, 2, 1]
+
+
+def delivery(event, payload):
+    return json.dumps({'event': event, 'payload': payload, 'delay': 30})
+
+
+def test_replayed_deliveries_drive_status_transitions(tmp_path, monkeypatch):
+    monkeypatch.setenv('GITHUB_TOKEN', 'test-token')
+    path = tmp_path / 'deliveries.jsonl'
+    path.write_text('\n'.join([
+        delivery('pull_request', {'action': 'synchronize', 'pull_request': {'number': 20, 'draft': True}}),
+        delivery('pull_request', {'action': 'ready_for_review', 'pull_request': {'number': 20, 'draft': False}}),
+        delivery('issue_comment', {'action': 'created', 'issue': {'number': 21, 'pull_request': {}},
+                                   'comment': {'user': {'login': 'copilot-swe-agent'},
+                                               'body': 'I need clarification on the expected layout'}}),
+        delivery('pull_request', {'action': 'closed', 'pull_request': {'number': 22, 'draft': True, 'merged': False}}),
+        delivery('check_suite', {'action': 'completed',
+                                 'check_suite': {'conclusion': 'success', 'pull_requests': [{'number': 23}]}}),
+        delivery('pull_request', {'action': 'ready_for_review', 'pull_request': {'number': 99, 'draft': False}}),
+    ]) + '\n')
+
+    receiver = PREventReceiver()
+    orchestrator = PROrchestrator(receiver)
+    for n in (20, 21, 22, 23):
+        orchestrator.claim_slot(n, f'PR {n}')
+    reviewed = []
+    orchestrator.mark_for_review = reviewed.append
+    orchestrator.client = StubGraphQL({'data': {'repository': {'p23': {
+        'number': 23, 'title': 'PR 23', 'isDraft': True, 'state': 'OPEN', 'mergeable': 'MERGEABLE',
+        'commits': {'nodes': []}, 'comments': {'pageInfo': {'endCursor': None}, 'nodes': []},
+    }}}})
+
+    # Recorded delays are skipped, so every delivery is queued before the orchestrator waits
+    receiver.replay(str(path), realtime=False).join(timeout=5)
+    statuses = orchestrator.wait_for_updates()
+
+    assert statuses == {20: 'completed', 21: 'needs_review', 22: 'failed', 23: 'in_progress'}
+
+    orchestrator.apply_statuses(statuses)
+
+    assert orchestrator.active_workers == [23]
+    assert orchestrator.completed_prs == [20, 21]
+    assert reviewed == [21]
+    assert [f['number'] for f in orchestrator.failed_prs] == [22]
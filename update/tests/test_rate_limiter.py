@@ -0,0 +1,54 @@
+import time
+
+from github_client import GitHubClient
+from rate_limiter import RateLimitScheduler
+
+
+class FakeResponse:
+    status_code = 200
+    text = ''
+
+    def __init__(self, headers, body=None):
+        self.headers = headers
+        self.body = body or {'data': {}}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+def test_budgets_are_kept_per_resource():
+    scheduler = RateLimitScheduler()
+    reset = int(time.time()) + 3600
+    scheduler.update_from_headers({'X-RateLimit-Remaining': '10', 'X-RateLimit-Reset': str(reset),
+                                   'X-RateLimit-Resource': 'graphql'})
+    scheduler.update_from_headers({'X-RateLimit-Remaining': '4000', 'X-RateLimit-Reset': str(reset),
+                                   'X-RateLimit-Resource': 'core'})
+
+    assert scheduler.budgets['graphql'][0] == 10
+    assert scheduler.budgets['core'][0] == 4000
+    # The spent GraphQL budget holds GraphQL requests but not REST ones
+    assert scheduler._delay(0, 'graphql') > 0
+    assert scheduler._delay(0, 'core') == 0
+
+
+def test_aliased_mutation_charges_one_write_token_per_input(monkeypatch):
+    client = GitHubClient('token')
+    charged = []
+    monkeypatch.setattr(client.scheduler, 'acquire',
+                        lambda write=False, resource='core': charged.append((write, resource)))
+    monkeypatch.setattr(client.session, 'request', lambda method, url, **kwargs: FakeResponse({}))
+
+    client.aliased_mutation('addComment', 'AddCommentInput', [{}] * 25, '{ clientMutationId }')
+
+    assert charged == [(25, 'graphql')]
+
+
+def test_write_cost_above_burst_leaves_bucket_in_debt():
+    scheduler = RateLimitScheduler(write_rate=1, write_burst=10)
+    scheduler.acquire(write=25)
+
+    assert scheduler.tokens < 0
+    assert scheduler._delay(1, 'core') > 0